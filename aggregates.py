@@ -0,0 +1,216 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from correlations import frame_cross_products
+from dataset import BP_STAGES, read_csv, read_csv_chunks
+
+# numeric columns averaged per occupation
+NUMERIC_COLUMNS = [
+    "Age",
+    "Sleep Duration",
+    "Quality of Sleep",
+    "Physical Activity Level",
+    "Stress Level",
+    "Heart Rate",
+    "Daily Steps"
+]
+
+# categorical columns broken down per occupation
+CATEGORY_COLUMNS = ["Gender", "BMI Category", "Sleep Disorder", "BP Stage"]
+
+# engine behind summarize_file: "pandas", or "duckdb" to run the aggregation as SQL
+# straight over the file (multi-threaded, spills to disk when larger than memory)
+BACKENDS = ["pandas", "duckdb"]
+BACKEND = os.environ.get("HEALTH_BACKEND", "pandas")
+
+
+# holds every per-occupation count, sum and category breakdown for one dataset
+class OccupationSummary:
+    def __init__(self, counts, sums, sumsq, categories, cross=None):
+        self.counts = counts            # respondents per occupation
+        self.sums = sums                # occupation x numeric column totals
+        self.sumsq = sumsq              # occupation x numeric column sums of squares
+        self.categories = categories    # column -> occupation x label counts
+        self.cross = cross              # Pearson CrossProducts of the correlation fields, if asked for
+
+    @property
+    def occupations(self):
+        return self.counts.index
+
+    @property
+    def means(self):
+        return self.sums.div(self.counts, axis=0)
+
+    # sample standard deviation from the running sums
+    @property
+    def stds(self):
+        n = self.counts
+        variance = (self.sumsq - self.sums.pow(2).div(n, axis=0)).div(n - 1, axis=0)
+        return np.sqrt(variance.clip(lower=0))
+
+    def category_counts(self, column):
+        return self.categories[column]
+
+    def category_pct(self, column):
+        counts = self.categories[column]
+        return counts.div(counts.sum(axis=1), axis=0) * 100
+
+    # occupations with a reasonable sample size, largest first (same order as value_counts)
+    def eligible(self, min_count=5):
+        counts = self.counts[self.counts >= min_count]
+        return counts.sort_values(ascending=False, kind="stable").index
+
+    # restrict the summary to some occupations (in the given order) without touching the raw rows
+    def select(self, occupations):
+        occupations = [occ for occ in occupations if occ in self.counts.index]
+        categories = {}
+        for column, counts in self.categories.items():
+            counts = counts.loc[occupations]
+            categories[column] = counts.loc[:, counts.sum() > 0]
+        cross = None if self.cross is None else self.cross.select(occupations)
+        return OccupationSummary(
+            self.counts.loc[occupations], self.sums.loc[occupations], self.sumsq.loc[occupations], categories, cross
+        )
+
+    # counts and sums are additive, so partial summaries (chunks, shards) fold together
+    def merge(self, other):
+        occupations = self.occupations.union(other.occupations, sort=False)
+        counts = self.counts.reindex(occupations, fill_value=0) + other.counts.reindex(occupations, fill_value=0)
+        sums = self.sums.reindex(occupations, fill_value=0).add(
+            other.sums.reindex(occupations, fill_value=0), fill_value=0
+        )
+        sumsq = self.sumsq.reindex(occupations, fill_value=0).add(
+            other.sumsq.reindex(occupations, fill_value=0), fill_value=0
+        )
+        categories = {}
+        columns = list(self.categories) + [c for c in other.categories if c not in self.categories]
+        for column in columns:
+            mine = self.categories.get(column)
+            theirs = other.categories.get(column)
+            if mine is None or theirs is None:
+                categories[column] = (mine if theirs is None else theirs).reindex(occupations, fill_value=0)
+                continue
+            labels = mine.columns.union(theirs.columns)
+            categories[column] = (
+                mine.reindex(index=occupations, columns=labels, fill_value=0)
+                + theirs.reindex(index=occupations, columns=labels, fill_value=0)
+            )
+        cross = None if self.cross is None or other.cross is None else self.cross.merge(other.cross)
+        return OccupationSummary(counts, sums, sumsq, categories, cross)
+
+
+# single pass over the frame: the occupation key is hashed once and every
+# statistic is accumulated from the resulting integer codes; with cross=True the
+# Pearson cross-products are summed too, so correlations merge like everything else
+def summarize(df, key="Occupation", cross=False):
+    codes, occupations = pd.factorize(df[key])
+    occupations = pd.Index(np.asarray(occupations), name=key)
+    valid = codes >= 0
+    codes = codes[valid]
+    n = len(occupations)
+
+    counts = pd.Series(np.bincount(codes, minlength=n), index=occupations, name="count")
+
+    sums = {}
+    sumsq = {}
+    for column in NUMERIC_COLUMNS:
+        if column in df.columns:
+            values = df[column].to_numpy(dtype="float64")[valid]
+            sums[column] = np.bincount(codes, weights=values, minlength=n)
+            sumsq[column] = np.bincount(codes, weights=values * values, minlength=n)
+    sums = pd.DataFrame(sums, index=occupations)
+    sumsq = pd.DataFrame(sumsq, index=occupations)
+
+    categories = {}
+    for column in CATEGORY_COLUMNS:
+        if column not in df.columns:
+            continue
+        label_codes, label_names = pd.factorize(df[column], sort=True)
+        label_codes = label_codes[valid]
+        present = label_codes >= 0
+        m = len(label_names)
+        pairs = np.bincount(codes[present] * m + label_codes[present], minlength=n * m)
+        categories[column] = pd.DataFrame(
+            pairs.reshape(n, m),
+            index=occupations,
+            columns=pd.Index(np.asarray(label_names), name=column)
+        )
+
+    return OccupationSummary(counts, sums, sumsq, categories, frame_cross_products(df, key) if cross else None)
+
+
+# fold partial summaries (chunks, shards) into one
+def merge_all(partials):
+    summary = None
+    for partial in partials:
+        summary = partial if summary is None else summary.merge(partial)
+    if summary is None:
+        raise ValueError("no rows to summarize")
+    return summary
+
+
+# fold an iterable of cleaned frames (e.g. csv chunks) into one summary
+# without ever holding more than one of them in memory
+def summarize_chunks(chunks, cross=False):
+    return merge_all(summarize(chunk, cross=cross) for chunk in chunks)
+
+
+# summary of one survey csv (or parquet copy, duckdb only), optionally streamed in chunks
+# and with the Pearson cross-products
+def summarize_file(path, chunksize=None, backend=None, cross=False):
+    backend = backend or BACKEND
+    if backend == "duckdb":
+        # imported here because sqlbackend builds on this module
+        from sqlbackend import summarize_sql
+        return summarize_sql(path, cross=cross)
+    if backend != "pandas":
+        raise ValueError(f"unknown backend: {backend}")
+    if chunksize:
+        return summarize_chunks(read_csv_chunks(path, chunksize), cross)
+    return summarize(read_csv(path), cross=cross)
+
+
+# aggregate each shard in its own worker process and merge the partial tables
+def summarize_shards(paths, workers=None, chunksize=None, backend=None):
+    if not paths:
+        raise ValueError("no shard files to summarize")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partials = pool.map(summarize_file, paths, [chunksize] * len(paths), [backend] * len(paths))
+        return merge_all(partials)
+
+
+# the Q1-Q4 tables for occupations with a reasonable sample size, sorted by name
+def question_tables(summary, min_count=5):
+    summary = summary.select(sorted(summary.eligible(min_count)))
+    means = summary.means
+
+    disorders = summary.category_pct("Sleep Disorder").reindex(
+        columns=["Insomnia", "Sleep Apnea", "No Disorder"], fill_value=0
+    )
+    disorders["Total"] = summary.counts
+
+    bmi = summary.category_pct("BMI Category").reindex(
+        columns=["Overweight", "Obese", "Normal Weight"], fill_value=0
+    )
+    bmi["Total"] = summary.counts
+
+    gender = summary.category_pct("Gender").reindex(columns=["Male", "Female"], fill_value=0)
+
+    sleep_bmi = means[["Quality of Sleep", "Sleep Duration"]].copy()
+    sleep_bmi["% Overweight + Obese"] = bmi["Overweight"] + bmi["Obese"]
+
+    bp = summary.category_pct("BP Stage").reindex(columns=BP_STAGES, fill_value=0)
+
+    return {
+        "disorders": disorders,
+        "stress_sleep": means[["Stress Level", "Sleep Duration", "Quality of Sleep", "Physical Activity Level"]],
+        "bmi": bmi,
+        "age": means["Age"],
+        "gender": gender,
+        "sleep_bmi": sleep_bmi,
+        "bp": bp,
+        "cardio": means[["Heart Rate", "Stress Level", "Daily Steps", "Quality of Sleep"]]
+    }
@@ -1,43 +1,189 @@
-import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-
-
-st.set_page_config(page_title="Workplace Health Dashboard", layout="centered")
-st.title("Workplace Health Lifestyle Data Analysis")
-
-# caches the result to avoid reloading on every rerun
-@st.cache_data
-def load_data():
-    df = pd.read_csv("Sleep_health_and_lifestyle_dataset.csv")
+from concurrent.futures import ThreadPoolExecutor
 
-    # fill missing values in and remove extra whitespace
-    df["Sleep Disorder"] = df["Sleep Disorder"].fillna("No Disorder").str.strip()
+import streamlit as st
 
-    # grouping similar roles
-    df["Occupation"] = df["Occupation"].replace({
-        "Sales Representative": "Sales",
-        "Salesperson": "Sales",
-        "Software Engineer": "Engineer"
-    })
+from aggregates import BACKEND, summarize_file
+from bootstrap import BootstrapRates
+from charts import (
+    bmi_figure, bmi_table, bp_figure, bp_table, cohort_figure, disorder_figure, disorder_table,
+    heart_figure, heart_table, sleep_bmi_figure, sleep_bmi_table, stress_figure, stress_table
+)
+from cohorts import CohortLoader, available_cohorts, cohort_table
+from correlations import ALL, Correlations, correlate_file, correlate_frame
+from content import (
+    CARDIO_CONCLUSION, CARDIO_INTRO, CARDIO_TITLE, CORRELATION_INTRO, EXT_CONCLUSION, EXT_INTRO,
+    EXT_TITLE, Q1_CONCLUSION, Q1_INTRO, Q1_TITLE, Q2_CONCLUSION, Q2_INTRO, Q2_TITLE, Q3_CONCLUSION,
+    Q3_INTRO, Q3_TITLE, STUDY_CONCLUSION, STUDY_TITLE, TITLE
+)
+from dataset import DATA_FILE, file_stamp, load_dataset
+from figcache import FigureCache
+from incremental import IncrementalSummary
+from instrument import StageTimer, note_miss
+from progressive import Pending
+from rawview import PAGE_SIZE, column_bounds, matching_rows, page, page_count
+from sqlbackend import RAW_COLUMNS, SQL_ERRORS, raw_bounds_sql, raw_count_sql, raw_page_sql
+from specs import bmi_spec, bp_spec, cohort_spec, disorder_spec, heart_spec, sleep_bmi_spec, stress_spec
 
-    # combine normal and normal weight BMI categories
-    df["BMI Category"] = df["BMI Category"].replace({"Normal": "Normal Weight"})
 
-    return df
+st.set_page_config(page_title="Workplace Health Dashboard", layout="centered")
+st.title(TITLE)
+
+# per-stage wall time, CPU time and peak memory for this rerun
+timer = StageTimer()
+
+# caches the result to avoid reloading on every rerun; keyed on the data version
+# so rows appended to the csv show up in the raw view. One frame shared by every
+# session (cache_data would hand each rerun its own copy), backed by the memory-mapped
+# Arrow cache so other worker processes share its pages too; never modify it
+@st.cache_resource(max_entries=2)
+def load_data(version):
+    note_miss("load_data")
+    # typed and cleaned: categoricals, small ints and parsed blood pressure
+    return load_dataset(DATA_FILE)
+
+# row positions matching the raw view's filters and sort order, so paging through
+# them never re-filters the frame
+@st.cache_resource(max_entries=4)
+def load_raw_rows(version, occupations, ranges, sort, ascending, _df):
+    note_miss("raw_rows")
+    return matching_rows(_df, occupations, ranges, sort, ascending)
+
+@st.cache_data(max_entries=2)
+def load_bounds(version):
+    note_miss("column_bounds")
+    return column_bounds(load_data(version))
+
+# with HEALTH_BACKEND=duckdb the raw view is filtered, sorted and paged by SQL over the
+# csv, so the file never has to fit in memory; a page change reads one page
+@st.cache_data(max_entries=2)
+def load_raw_bounds_sql(version):
+    note_miss("raw_bounds_sql")
+    return raw_bounds_sql(DATA_FILE)
+
+@st.cache_data(max_entries=4)
+def load_raw_count_sql(version, occupations, ranges):
+    note_miss("raw_count_sql")
+    return raw_count_sql(DATA_FILE, occupations, ranges)
+
+@st.cache_data(max_entries=16)
+def load_raw_page_sql(version, occupations, ranges, sort, ascending, number, columns):
+    note_miss("raw_page_sql")
+    return raw_page_sql(DATA_FILE, occupations, ranges, sort, ascending, number, PAGE_SIZE, columns)
+
+# per-occupation counts, sums, sums of squares and category counts, shared by all
+# sessions; each rerun folds in only the rows appended since the last one, so a
+# selection change only picks k small rows out of this cube
+@st.cache_resource
+def incremental_summary():
+    return IncrementalSummary(DATA_FILE)
+
+# with HEALTH_BACKEND=duckdb the same cube comes from one SQL query over the csv,
+# which never has to fit in memory
+@st.cache_data(max_entries=2)
+def load_summary_sql(version):
+    note_miss("load_summary_sql")
+    return summarize_file(DATA_FILE, backend="duckdb", cross=True)
+
+# bootstrap resamples of the disorder / BMI shares for every occupation, once per
+# data version; a selection change only reads percentiles for the chosen rows
+@st.cache_resource(max_entries=4)
+def load_rates(version, column, _cube):
+    note_miss("rates_" + column)
+    return BootstrapRates(_cube.category_counts(column))
+
+# Spearman ranks every respondent, so unlike Pearson (kept in the cube) it needs a full
+# pass over the data; only run when asked for, then shared per data version. The duckdb
+# backend streams the csv in chunks instead of loading the whole frame
+@st.cache_data(max_entries=2)
+def load_spearman(version):
+    note_miss("load_spearman")
+    if BACKEND == "duckdb":
+        return correlate_file(DATA_FILE, chunksize=100_000)
+    return correlate_frame(load_data(version))
+
+# comparison cohorts are summarized on a thread pool shared by all sessions
+@st.cache_resource
+def cohort_loader():
+    return CohortLoader(workers=4, backend=BACKEND)
+
+# charts are drawn on this pool (shared by all sessions) while the page text streams out
+@st.cache_resource
+def render_pool():
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="render")
+
+# rendered chart bytes shared across sessions, keyed on widget state and data version
+@st.cache_resource
+def figure_cache():
+    return FigureCache(maxsize=64)
 
 data_load_state = st.text("Loading data...")
-df = load_data()
-data_load_state.text("Loading data...done! (using st.cache_data)")
+if BACKEND == "duckdb":
+    version = file_stamp(DATA_FILE)
+    cube = timer.cached("load_summary_sql", load_summary_sql, version)
+else:
+    aggregates = incremental_summary()
+    with timer.stage("refresh_summary") as fields:
+        cube, version, fields["new_rows"] = aggregates.refresh()
+        fields["rejected_rows"] = aggregates.rejected
+skipped = "" if BACKEND == "duckdb" or not aggregates.rejected else f", {aggregates.rejected} malformed rows skipped"
+data_load_state.text(f"Loading data...done! ({int(cube.counts.sum())} rows, {BACKEND} backend{skipped})")
+
+# the raw rows are filtered, sorted and paged on the server; only one page is sent,
+# and paging reruns only this fragment
+@st.fragment
+def raw_data_view(version):
+    with timer.section("raw_data") as stages:
+        try:
+            if BACKEND == "duckdb":
+                total, occupations, bounds = stages.cached("raw_bounds_sql", load_raw_bounds_sql, version)
+                columns = RAW_COLUMNS
+            else:
+                df = stages.cached("load_data", load_data, version)
+                bounds = stages.cached("column_bounds", load_bounds, version)
+                total, occupations, columns = len(df), df["Occupation"].cat.categories, list(df.columns)
+        except (ValueError, *SQL_ERRORS) as error:
+            # a malformed row stops the full read; the summaries above skip it instead
+            st.warning(f"The raw rows can't be shown until the csv is fixed: {error}")
+            return
+
+        raw_jobs = st.multiselect("Occupations:", occupations, key="raw_jobs")
+        raw_columns = st.multiselect("Columns:", columns, default=columns, key="raw_columns")
+        left, right = st.columns(2)
+        range_column = left.selectbox("Filter range of:", ["(none)"] + list(bounds), key="raw_range")
+        sort_column = right.selectbox("Sort by:", ["(file order)"] + columns, key="raw_sort")
+        ranges = ()
+        if range_column in bounds:
+            low, high = bounds[range_column]
+            if low < high:
+                ranges = ((range_column, *st.slider(range_column, low, high, (low, high), key="raw_slider")),)
+        sort = sort_column if sort_column in columns else None
+        ascending = not (sort and right.toggle("Descending", key="raw_descending"))
+
+        if BACKEND == "duckdb":
+            matches = stages.cached("raw_count_sql", load_raw_count_sql, version, tuple(raw_jobs), ranges)
+        else:
+            rows = stages.cached("raw_rows", load_raw_rows, version, tuple(raw_jobs), ranges, sort, ascending, df)
+            matches = len(rows)
+        pages = page_count(matches)
+        number = st.number_input(f"Page (of {pages}):", min_value=1, max_value=pages, value=1, key="raw_page")
+        st.caption(f"{matches:,} matching rows of {total:,}, showing {PAGE_SIZE} per page")
+        with stages.stage("raw_page"):
+            if BACKEND == "duckdb":
+                window = stages.cached(
+                    "raw_page_sql", load_raw_page_sql,
+                    version, tuple(raw_jobs), ranges, sort, ascending, number, tuple(raw_columns) or None
+                )
+            else:
+                window = page(df, rows, number, PAGE_SIZE, raw_columns or None)
+            st.dataframe(window)
 
 # filter
 if st.checkbox("Show raw data"):
     st.subheader("Raw Data")
-    st.dataframe(df)
+    raw_data_view(version)
 
 # occupation Filter
-valid_jobs = df["Occupation"].value_counts()[lambda x: x >= 5].index
+valid_jobs = cube.eligible(5)
 
 selected_jobs = st.multiselect(
     "Select Occupations to display:", 
@@ -51,364 +197,362 @@ if not selected_jobs:
     st.info("At least one occupation must be selected.")
     selected_jobs = valid_jobs
 
-# filter the dataset to include only the selected occupations
-filtered_df = df[df["Occupation"].isin(selected_jobs)]
+# keep only the selected occupations (in dataset order) from the precomputed cube
+with timer.stage("select_occupations"):
+    selected = set(selected_jobs)
+    summary = cube.select([occ for occ in cube.occupations if occ in selected])
 
 # get the unique occupation labels for the x-axis
-labels = filtered_df["Occupation"].unique().tolist()
-x = np.arange(len(labels))
-width = 0.25 # width of each bar
+labels = summary.occupations.tolist()
 
-# 1. Sleep disorder distribution by occupation bar chart
-st.subheader("Question 1: Which occupations report the highest percentage of sleep disorders?")
-
-st.markdown("""
-This section analyzes which professions report the **highest prevalence of sleep disorders**.
-
-The chart below displays the **percentage distribution** of each sleep disorder (or lack thereof) across occupations.  
-This helps highlight whether certain jobs are more strongly associated with sleep-related health issues.
-""")
-
-# count the number of occurrences for each occupation/ sleep disorder pair
-disorder_counts = filtered_df.groupby(["Occupation", "Sleep Disorder"]).size().unstack(fill_value=0)
+# any change to the data or a widget gives a different figure cache key
+figures = figure_cache()
 
-# convert counts to percentages
-disorder_pct = disorder_counts.div(disorder_counts.sum(axis=1), axis=0) * 100
-
-# extract percentages for main disorder types
-insomnia = disorder_pct.get("Insomnia", pd.Series([0]*len(labels), index=labels)).reindex(labels).fillna(0).tolist()
-
-sleep_apnea = disorder_pct.get("Sleep Apnea", pd.Series([0]*len(labels), index=labels)).reindex(labels).fillna(0).tolist()
-
-no_disorder = disorder_pct.get("No Disorder", pd.Series([0]*len(labels), index=labels)).reindex(labels).fillna(0).tolist()
+# browser mode ships only the aggregated tables plus a Vega-Lite spec
+render_mode = st.sidebar.radio(
+    "Chart rendering:",
+    ["Server (matplotlib)", "Browser (Vega-Lite)"],
+    help="Browser rendering sends the small per-occupation tables and lets the browser draw the charts."
+)
 
-# create the bar chart
-fig, ax = plt.subplots(figsize=(10, 6))
+# other cohorts load in the background; the charts never wait for them, and each
+# comparison shows whichever cohorts are ready so far. Only cohorts configured on the
+# server (HEALTH_COHORTS, HEALTH_COHORT_DIR) can be picked, never a typed path
+cohort_sources = available_cohorts()
+chosen_cohorts = st.sidebar.multiselect(
+    "Compare with cohorts:",
+    list(cohort_sources),
+    default=list(cohort_sources),
+    disabled=not cohort_sources,
+    help="Cohorts set up on the server, e.g. last year's export or another site."
+)
+cohort_jobs = {}
+for name in chosen_cohorts:
+    path = cohort_sources[name]
+    try:
+        cohort_jobs[name] = cohort_loader().submit(path)
+    except OSError as error:
+        st.sidebar.warning(f"Cohort {name} could not be read: {error.strerror}")
+
+def show_cohorts(key, title, ylabel, table, stages=None):
+    stages = stages or timer
+    if not cohort_jobs:
+        return
+    summaries = {"Current": cube}
+    versions = [version]
+    for name, (cohort_version, job) in cohort_jobs.items():
+        if job.done() and job.exception() is None:
+            summaries[name] = job.result()
+            versions.append((name, cohort_version))
+    pending = [name for name, (_, job) in cohort_jobs.items() if not job.done()]
+    if pending:
+        st.caption("Loading cohorts: " + ", ".join(pending) + "…")
+    if len(summaries) < 2:
+        return
+
+    long = cohort_table(summaries, labels, table)
+    draw_later(
+        key[0] + "_cohorts",
+        key + ("cohorts",) + tuple(versions),
+        lambda: cohort_figure(long, title, ylabel),
+        lambda: cohort_spec(long, title, ylabel),
+        stages,
+        cohorts=len(summaries)
+    )
+
+# every chart first gets a placeholder; the figure (or Vega-Lite spec) is built on the
+# render pool and fills it when drained, so all text is on screen before any chart
+pending_charts = Pending(render_pool())
+
+def draw_later(name, key, draw, spec, stages, **fields):
+    placeholder = st.empty()
+    placeholder.caption("Drawing chart…")
+    if render_mode == "Browser (Vega-Lite)":
+        work = spec
+    else:
+        work = lambda: figures.render(key, draw)
+
+    def show(result, render_ms):
+        with stages.stage(name, mode=render_mode, render_ms=render_ms, **fields):
+            if render_mode == "Browser (Vega-Lite)":
+                placeholder.vega_lite_chart(*result, width="stretch")
+            else:
+                placeholder.image(result)
+
+    pending_charts.submit(work, show)
+
+def show_chart(key, draw, spec, stages=None):
+    draw_later(key[0] + "_chart", key + (version,), draw, spec, stages or timer)
 
-# plot each category of sleep disorder
-ax.bar(x - width, insomnia, width, label="Insomnia")
-ax.bar(x, sleep_apnea, width, label="Sleep Apnea")
-ax.bar(x + width, no_disorder, width, label="No Disorder")
+# 1. Sleep disorder distribution by occupation bar chart
+st.subheader(Q1_TITLE)
 
-# chart title, labels & legend
-ax.set_title("Sleep Disorders by Occupation (%)")
-ax.set_ylabel("Percentage")
-ax.set_xticks(x)
-ax.set_xticklabels(labels, rotation=45)
-ax.set_ylim(0, 100)
-ax.legend()
+st.markdown(Q1_INTRO)
 
-# add percentage labels above each bar
-for i in range(len(labels)):
-    ax.text(x[i] - width, insomnia[i] + 0.5, f"{insomnia[i]:.1f}%", ha="center", va="bottom", fontsize=8)
-    ax.text(x[i], sleep_apnea[i] + 0.5, f"{sleep_apnea[i]:.1f}%", ha="center", va="bottom", fontsize=8)
-    ax.text(x[i] + width, no_disorder[i] + 0.5, f"{no_disorder[i]:.1f}%", ha="center", va="bottom", fontsize=8)
+# percentage of each occupation in each sleep disorder category
+# with 95% bootstrap intervals, since some occupations only just pass the threshold
+disorder_rates = timer.cached("rates_Sleep Disorder", load_rates, version, "Sleep Disorder", cube)
+with timer.stage("disorders_table"):
+    disorder_pct = disorder_table(summary, labels, disorder_rates)
 
-# display the chart
-st.pyplot(fig)
+# display the chart (rendered once per selection)
+show_chart(
+    ("disorders", tuple(labels)),
+    lambda: disorder_figure(disorder_pct),
+    lambda: disorder_spec(disorder_pct)
+)
+show_cohorts(
+    ("disorders", tuple(labels)),
+    "Sleep Disorders by Occupation and Cohort (%)", "Percentage",
+    lambda cohort: disorder_table(cohort, labels)
+)
 
 st.markdown("#### Conclusion")
 
-st.markdown("""
-→ **Sales workers** are the **most affected by sleep disorders**:  
-- **85.3%** report **insomnia**  
-- **8.8%** report **sleep apnea**  
-- Only **5.9%** report **no disorder**
-            
-
-→ **Nurses** have the **highest rate of sleep apnea** by far (**83.6%**), significantly exceeding all other professions (ranging from 0% to ~10%).
-
-→ **Teachers** also show **high insomnia prevalence** (**67.5%**), and only **22.5%** report **no disorder**.
-
-→ In contrast, **Doctors, Engineers, Accountants, and Lawyers** show the **lowest disorder rates**, with **over 80%** in each group reporting **no sleep disorder**.
-""")
+st.markdown(Q1_CONCLUSION)
 
 
 st.markdown("---")
 # 2. Sleep duration by stress level bar chart with stress, sleep quality, physical activity)
-st.subheader("Question 2: Do occupations with higher stress levels also report lower sleep quality or fewer sleep hours?")
-
-st.markdown("""
-This analysis examines whether occupations with **higher average stress levels** also tend to report **lower sleep quality** or **shorter sleep duration**.
-
-The chart below compares **stress levels**, **sleep duration**, and **sleep quality** across professions.  
-While the focus is on stress and sleep, **physical activity** is included as a secondary factor to observe whether it may also play a role in sleep health or if **stress remains the stronger predictor**.
-""")
-
-# calculate means by Occupation
-stress_levels = filtered_df.groupby("Occupation")["Stress Level"].mean().reindex(labels)
-sleep_duration = filtered_df.groupby("Occupation")["Sleep Duration"].mean().reindex(labels)
-sleep_quality = filtered_df.groupby("Occupation")["Quality of Sleep"].mean().reindex(labels)
-physical_activity = filtered_df.groupby("Occupation")["Physical Activity Level"].mean().reindex(labels)
-
-# let the user filter metrics
-metric_options = ["Stress Level", "Sleep Duration", "Quality of Sleep"]
-selected_metrics = st.multiselect(
-    "Select metrics to display:",
-    metric_options,
-    default=metric_options,
-    help="Choose which metrics to show as bars. Line chart always shows Physical Activity."
-)
-
-# create the figure
-fig, ax1 = plt.subplots(figsize=(10, 6))
-
-# offsets for bar positioning
-offsets = {
-    "Stress Level": -width,
-    "Sleep Duration": 0,
-    "Quality of Sleep": width
-}
-
-# plot only selected bars
-if "Stress Level" in selected_metrics:
-    ax1.bar(x + offsets["Stress Level"], stress_levels, width, label="Stress Level")
-if "Sleep Duration" in selected_metrics:
-    ax1.bar(x + offsets["Sleep Duration"], sleep_duration, width, label="Sleep Duration")
-if "Quality of Sleep" in selected_metrics:
-    ax1.bar(x + offsets["Quality of Sleep"], sleep_quality, width, label="Quality of Sleep")
-
-# bar axis settings
-ax1.set_ylabel("Scale (0–10)")
-ax1.set_ylim(0, 10)
-ax1.set_xticks(x)
-ax1.set_xticklabels(labels, rotation=45)
-ax1.set_title("Stress, Sleep, and Physical Activity by Occupation")
-
-# line chart on twin axis
-ax2 = ax1.twinx()
-ax2.plot(x, physical_activity, label="Physical Activity", color="tab:red", marker="o", linewidth=2)
-ax2.set_ylim(0, 100)
-ax2.set_ylabel("Physical Activity Level (0–100)")
-
-# combine legends
-lines_1, labels_1 = ax1.get_legend_handles_labels()
-lines_2, labels_2 = ax2.get_legend_handles_labels()
-ax1.legend(lines_1 + lines_2, labels_1 + labels_2, loc='upper left')
-
-# display chart
-st.pyplot(fig)
+st.subheader(Q2_TITLE)
+
+st.markdown(Q2_INTRO)
+
+# the metric picker reruns only this chart (a fragment), not the whole page
+@st.fragment
+def stress_section(summary, labels):
+    with timer.section("stress") as stages:
+        # means by Occupation
+        with stages.stage("stress_table"):
+            means = stress_table(summary, labels)
+
+        # let the user filter metrics
+        metric_options = ["Stress Level", "Sleep Duration", "Quality of Sleep"]
+        selected_metrics = st.multiselect(
+            "Select metrics to display:",
+            metric_options,
+            default=metric_options,
+            help="Choose which metrics to show as bars. Line chart always shows Physical Activity."
+        )
+
+        # display chart
+        show_chart(
+            ("stress", tuple(labels), tuple(selected_metrics)),
+            lambda: stress_figure(means, selected_metrics),
+            lambda: stress_spec(means, selected_metrics),
+            stages
+        )
+        show_cohorts(
+            ("stress", tuple(labels), tuple(selected_metrics)),
+            "Stress, Sleep, and Physical Activity by Cohort", "Average",
+            lambda cohort: stress_table(cohort, labels)[selected_metrics + ["Physical Activity Level"]],
+            stages
+        )
+
+stress_section(summary, labels)
 
 st.markdown("#### Conclusion")
 
-st.markdown("""
-
-There’s a clear correlation between **higher stress** and **poorer sleep health**.
-
-→ **Sales workers** report the **highest stress level** (**7.1**), **lowest sleep duration** (**6.4 hours**), and **worst sleep quality** (**5.9**).
-
-→ **Doctors** also show **high stress** (**6.7**) and **poor sleep quality** (**6.6**), although their sleep duration is slightly better (**7 hours**).            
-
-→ **Engineers**, on the other hand, report the **lowest stress** (**4.0**), **highest sleep duration** (**7.9 hours**), and **best sleep quality** (**8.3**).
-            
-**Physical Activity Comparison**  
-- **Most Active:** Nurses (78.6), Lawyers (70.4)  
-- **Least Active:** Engineers (51.6), Sales Workers (44.1)
-            
-→ Interestingly, **physical activity levels** appear to vary independently as **nurses (78.6)** and **lawyers (70.4)** report the highest activity, while **engineers (51.6)** and **sales workers (44.1)** are less active. Despite lower activity, engineers report excellent sleep, which may mean **stress has a stronger influence on sleep health** than physical activity alone.
-""")
+st.markdown(Q2_CONCLUSION)
 
 
 
 st.markdown("---")
 # 3. BMI Category distribution by occupation bar chart with secondary axis for average age
-st.subheader("Question 3: Are there noticeable differences in BMI category distribution across occupations?")
-
-st.markdown("""
-This analysis investigates how rates of **overweight** and **obesity** vary across different occupations.  
-Since both **age** and **gender** are known to influence body mass index, we include them as important factors to contextualize the BMI differences observed.
-
-- **Age** affects metabolism and fat distribution, often increasing BMI as people get older ([Jura M, Kozak LP., 2016](https://pmc.ncbi.nlm.nih.gov/articles/PMC5005878/)).  
-- **Gender** influences body composition and fat patterns, with different prevalence of overweight/obesity between genders ([Koceva A, Herman R, Janez A, Rakusa M, Jensterle M., 2024](https://pmc.ncbi.nlm.nih.gov/articles/PMC11242171/)).
-
-By examining BMI together with average age and gender distribution, we can better understand the patterns by occupation in weight variations and identify whether age or gender alone can explain these differences.
-""")
-
-
-# filter for BMI categories
-bmi_options = ["Overweight", "Obese"]
-selected_bmi = st.multiselect(
-    "Select metrics to display:",
-    bmi_options,
-    default=bmi_options,
-    help="Choose which BMI categories to combine for each occupation."
-)
-
-# Compute BMI counts and percentages
-bmi_counts = filtered_df.groupby(["Occupation", "BMI Category"]).size().unstack(fill_value=0).reindex(labels).fillna(0)
-bmi_pct = bmi_counts.div(bmi_counts.sum(axis=1), axis=0) * 100
-
-# Add together selected categories (default: Overweight + Obese)
-bmi_combined = pd.Series([0]*len(labels), index=labels)
-for category in selected_bmi:
-    if category in bmi_pct.columns:
-        bmi_combined += bmi_pct[category]
-
-# Compute average age
-age_by_occupation = filtered_df.groupby("Occupation")["Age"].mean().reindex(labels)
-
-# Create plot
-fig, ax1 = plt.subplots(figsize=(10, 6))
-bars = ax1.bar(x, bmi_combined, color='steelblue')
-ax1.set_ylabel("% " + " + ".join(selected_bmi) if selected_bmi else "BMI %")
-ax1.set_xticks(x)
-ax1.set_xticklabels(labels, rotation=45)
-y_max = bmi_combined.max() if selected_bmi else 1
-ax1.set_ylim(0, y_max + 10)
-ax1.set_title("BMI Rate vs Age by Occupation")
-
-# Gender label annotations
-gender_counts = filtered_df.groupby(["Occupation", "Gender"]).size().unstack(fill_value=0).reindex(labels).fillna(0)
-gender_pct = gender_counts.div(gender_counts.sum(axis=1), axis=0) * 100
-
-for i, occupation in enumerate(labels):
-    male_pct = gender_pct.loc[occupation, "Male"] if "Male" in gender_pct.columns else 0
-    female_pct = gender_pct.loc[occupation, "Female"] if "Female" in gender_pct.columns else 0
-    label = f"{male_pct:.0f}% M" if male_pct > female_pct else f"{female_pct:.0f}% F"
-    ax1.text(i, bmi_combined.iloc[i] + 2, label, ha='center', va='bottom', fontsize=9)
-
-# Secondary axis: average age
-ax2 = ax1.twinx()
-ax2.plot(x, age_by_occupation, color="tab:red", marker='o', linewidth=2, label="Average Age")
-ax2.set_ylabel("Average Age")
-ax2.set_ylim(age_by_occupation.min() * 0.95, age_by_occupation.max() * 1.05)
-
-# Combine legends
-lines_1, labels_1 = ax1.get_legend_handles_labels()
-lines_2, labels_2 = ax2.get_legend_handles_labels()
-ax1.legend(lines_1 + lines_2, labels_1 + labels_2, loc='upper right')
-
-# Show chart
-st.pyplot(fig)
+st.subheader(Q3_TITLE)
+
+st.markdown(Q3_INTRO)
+
+
+# the BMI category picker reruns only this chart (a fragment)
+@st.fragment
+def bmi_section(summary, labels):
+    with timer.section("bmi") as stages:
+        # filter for BMI categories
+        bmi_options = ["Overweight", "Obese"]
+        selected_bmi = st.multiselect(
+            "Select metrics to display:",
+            bmi_options,
+            default=bmi_options,
+            help="Choose which BMI categories to combine for each occupation."
+        )
+
+        # BMI share of the selected categories (with bootstrap intervals), average age and dominant gender
+        bmi_rates = stages.cached("rates_BMI Category", load_rates, version, "BMI Category", cube)
+        with stages.stage("bmi_table"):
+            bmi_by_occupation = bmi_table(summary, labels, selected_bmi, bmi_rates)
+
+        # Show chart
+        show_chart(
+            ("bmi", tuple(labels), tuple(selected_bmi)),
+            lambda: bmi_figure(bmi_by_occupation, selected_bmi),
+            lambda: bmi_spec(bmi_by_occupation, selected_bmi),
+            stages
+        )
+        show_cohorts(
+            ("bmi", tuple(labels), tuple(selected_bmi)),
+            "BMI Rate and Age by Cohort", "Percentage / years",
+            lambda cohort: bmi_table(cohort, labels, selected_bmi)[["BMI %", "Average Age"]],
+            stages
+        )
+
+bmi_section(summary, labels)
 
 st.markdown("#### Conclusion")
 
-st.markdown("""
-→ **Sales workers, nurses, and teachers** exhibit the **highest rates of overweight and obesity** (ranging between **85% and 100%** of participants).
-
-→ **Doctors, engineers, and lawyers** tend to maintain **predominantly healthy BMI levels**.
-
-→ **Age and physical activity alone do not fully explain BMI differences**:  
-- Nurses have the **highest physical activity levels** but still poor BMI outcomes.  
-- Engineers are on average **older** and moderately active (**51.6**), yet maintain healthy weights.
-
-→ This suggests **other factors** such as **sleep quality, stress, or working conditions** may significantly influence BMI.
-
-→ Regarding **gender distribution**:  
-- Occupations with higher overweight/obesity rates are often **female-dominated** (e.g., nurses, teachers).  
-- However, sales (a **male-dominated field**) also reports very poor BMI results, indicating gender alone does **not fully explain** the differences.
-
-""")
+st.markdown(Q3_CONCLUSION)
 
 
 st.markdown("---")
 # 4. Correlation: BMI vs Sleep Quality and Sleep Duration
-st.subheader("Extended Conclusion: Revisiting BMI with Sleep as a Key Factor")
-
-st.markdown("""**Additional question:** *What if sleep quality and sleep duration were stronger predictors of BMI than gender or age?*
-
-While the initial analysis of question n°3 showed clear differences in BMI across occupations,  
-factors like **age**, **gender**, and **physical activity** offered only **partial explanations**.
-            
-This section explores the relationship between BMI rates and sleep metrics (quality and duration) across occupations.            
-""")
-
-
-# Combine BMI categories
-bmi_percent = filtered_df.groupby(["Occupation", "BMI Category"]).size().unstack(fill_value=0)
-bmi_percent = bmi_percent.div(bmi_percent.sum(axis=1), axis=0) * 100
+st.subheader(EXT_TITLE)
 
-# Combine Overweight + Obese for above-normal BMI %
-bmi_overweight_obese = (
-    bmi_percent.get("Overweight", pd.Series(0, index=bmi_percent.index)) +
-    bmi_percent.get("Obese", pd.Series(0, index=bmi_percent.index))
-).reindex(labels).fillna(0)
+st.markdown(EXT_INTRO)
 
-# Get average sleep quality and duration
-sleep_quality = filtered_df.groupby("Occupation")["Quality of Sleep"].mean().reindex(labels)
-sleep_duration = filtered_df.groupby("Occupation")["Sleep Duration"].mean().reindex(labels)
 
-# plot
-fig, ax = plt.subplots(1, 2, figsize=(12, 5))
+# % overweight + obese against average sleep quality and duration
+with timer.stage("sleep_bmi_table"):
+    sleep_bmi = sleep_bmi_table(summary, labels)
 
-# BMI vs Sleep Quality
-ax[0].scatter(sleep_quality, bmi_overweight_obese)
-for i, occ in enumerate(labels):
-    ax[0].annotate(occ, (sleep_quality[i], bmi_overweight_obese[i]), fontsize=8)
-ax[0].set_xlabel("Average Sleep Quality")
-ax[0].set_ylabel("% Overweight + Obese")
-ax[0].set_title("BMI vs Sleep Quality")
-
-# BMI vs Sleep Duration
-ax[1].scatter(sleep_duration, bmi_overweight_obese)
-for i, occ in enumerate(labels):
-    ax[1].annotate(occ, (sleep_duration[i], bmi_overweight_obese[i]), fontsize=8)
-ax[1].set_xlabel("Average Sleep Duration (hrs)")
-ax[1].set_ylabel("% Overweight + Obese")
-ax[1].set_title("BMI vs Sleep Duration")
+show_chart(
+    ("sleep_bmi", tuple(labels)),
+    lambda: sleep_bmi_figure(sleep_bmi),
+    lambda: sleep_bmi_spec(sleep_bmi)
+)
+show_cohorts(
+    ("sleep_bmi", tuple(labels)),
+    "BMI and Sleep by Cohort", "Percentage / average",
+    lambda cohort: sleep_bmi_table(cohort, labels)[["% Overweight + Obese", "Quality of Sleep", "Sleep Duration"]]
+)
 
-plt.tight_layout()
-st.pyplot(fig)
+# correlations between every numeric field, respondent by respondent
+st.markdown(CORRELATION_INTRO)
+
+# switching method or respondents reruns only the matrix (a fragment); Pearson comes
+# straight from the cube's running cross-products, Spearman is computed on request and
+# kept for the session until asked to catch up with newer rows
+@st.fragment
+def correlation_section(labels):
+    with timer.section("correlations") as stages:
+        method_col, occupation_col = st.columns(2)
+        method = method_col.radio(
+            "Correlation:",
+            ["Pearson", "Spearman"],
+            horizontal=True,
+            help="Spearman correlates ranks, so it also picks up monotonic relationships that are not linear."
+        )
+        scope = occupation_col.selectbox("Respondents:", [ALL] + labels)
+
+        correlations = Correlations(cube.cross)
+        if method == "Spearman":
+            spearman = st.session_state.get("spearman")  # (data version, Correlations)
+            if spearman is None or spearman[0] != version:
+                label = "Compute Spearman" if spearman is None else "Update Spearman with the latest rows"
+                slot = st.empty()
+                if slot.button(label, help="Ranks every respondent, so it reads the whole dataset."):
+                    try:
+                        spearman = (version, stages.cached("load_spearman", load_spearman, version))
+                    except ValueError as error:
+                        st.warning(f"Spearman can't be computed until the csv is fixed: {error}")
+                        return
+                    st.session_state["spearman"] = spearman
+                    slot.empty()
+            if spearman is None:
+                return
+            if spearman[0] != version:
+                st.caption("Computed before the latest rows arrived.")
+            correlations = spearman[1]
+
+        with stages.stage("correlation_table"):
+            matrix = correlations.matrix(method.lower(), None if scope == ALL else scope)
+        st.dataframe(
+            matrix.style.format("{:.2f}", na_rep="–").background_gradient(cmap="RdBu_r", vmin=-1, vmax=1)
+        )
+
+correlation_section(labels)
 
 st.markdown("#### Conclusion")
 
-st.markdown("""
-By comparing the percentage of overweight and obese individuals in each occupation with their average sleep quality and duration, we can observe the following patterns:
-
-→ **Sales Workers** suffer from the **worst sleep quality** (5.9) and **shortest sleep duration** (6.4 hours),  
-resulting in the **highest overweight/obesity rates** (~100%).
-
-→ **Teachers and Nurses** experience **poor sleep health** (quality between 6.3–6.4 and about 6.6 hours sleep),  
-with **very high BMI issues** (~85%–90%).
-
-→ **Engineers and Lawyers** enjoy the **best sleep health** (quality between 7.8–8.3 and 7.6–7.9 hours sleep),  
-and have the **healthiest BMI profiles**.
-
-→ **Doctors are an exception**: despite **poorer sleep quality than engineers** (6.6 quality, 7.0 hours),  
-they maintain better BMI results, likely due to **protective factors** such as:  
-- Medical knowledge  
-- Healthier lifestyle habits  
-- Better dietary choices
-
-→ ** What it demonstrates:** 
-Sleep metrics (quality and hours) appear to better align with BMI patterns than other factors.
-Occupations with poor sleep tend to have worse BMI outcomes. Additionally, the results also suggest that possible protective factors can also play a strong role in BMI results.
-""")
+st.markdown(EXT_CONCLUSION)
 
 st.markdown("---")
+# 5. Blood pressure stage, heart rate vs stress and daily steps vs sleep quality
+st.subheader(CARDIO_TITLE)
 
-st.subheader("Study Conclusion")
+st.markdown(CARDIO_INTRO)
 
-st.markdown("""
-This study examined the relationships between occupation, sleep disorders, BMI categories, and sleep quality/duration to understand health disparities **across professions**.
+# the stage of every reading was set at load time, so these come straight from the cube
+with timer.stage("cardio_tables"):
+    bp_by_occupation = bp_table(summary, labels)
+    heart = heart_table(summary, labels)
 
-##### Key insights:
+show_chart(
+    ("bp", tuple(labels)),
+    lambda: bp_figure(bp_by_occupation),
+    lambda: bp_spec(bp_by_occupation)
+)
+show_cohorts(
+    ("bp", tuple(labels)),
+    "Blood Pressure Stage by Cohort (%)", "Percentage",
+    lambda cohort: bp_table(cohort, labels)[["Stage 1", "Stage 2"]]
+)
+show_chart(
+    ("heart", tuple(labels)),
+    lambda: heart_figure(heart),
+    lambda: heart_spec(heart)
+)
+show_cohorts(
+    ("heart", tuple(labels)),
+    "Heart Rate, Stress, Steps and Sleep Quality by Cohort", "Average",
+    lambda cohort: heart_table(cohort, labels)[["Heart Rate", "Stress Level", "Quality of Sleep"]]
+)
 
-- Certain occupations, such as **sales workers, nurses, and teachers**, show significantly higher rates of sleep disorders (especially insomnia and sleep apnea) and elevated BMI levels, which highlights a concerning overlap between poor sleep health and weight issues.
+st.markdown("#### Conclusion")
 
-- In contrast, **doctors, engineers, accountants, and lawyers** tend to have lower prevalence of sleep disorders and healthier BMI levels. This may reflect not only greater health awareness, but also more stable work environments, structured routines, and access to resources that support healthier lifestyles. 
+st.markdown(CARDIO_CONCLUSION)
 
-- For example, while doctors report poorer sleep than expected, they still maintain relatively healthy BMI levels, likely due to the nature of their profession, which involves medical training and knowledge, and a culture that emphasizes preventive care and healthy habits.
+st.markdown("---")
 
-- Similarly, engineers and lawyers, despite mostly sedentary work, show better sleep and BMI profiles, suggesting that job structure plays a key role in shaping a healthy lifestyle.
-            
-While factors like age, gender, and physical activity do play a role, they do not fully account for the differences observed across occupations. This suggests that other elements, such as sleep or stress may have a stronger and more direct influence on health outcomes.
+st.subheader(STUDY_TITLE)
 
-Therefore, **sleep quality and duration emerge as strong predictors of BMI status across occupations**, as those with poorer sleep consistently show higher rates of overweight and obesity. These findings demonstrate the importance of considering workplace conditions when addressing public health issues related to weight and well-being.
+st.markdown(STUDY_CONCLUSION)
 
-**Protective factors** such as medical knowledge and healthier habits appear to buffer some groups (e.g., doctors) against poor BMI outcomes despite less ideal sleep metrics.
+# fill the chart placeholders as their renders finish
+pending_charts.drain()
 
-##### Implications:
-            
-Understanding how work influences and is interconnected to sleep and BMI results can help shape more effective workplace health initiatives. Occupation factors can affect sleep habits, stress levels and long-term weight outcomes. These results emphasize the need for employers to address work-related factors and that targeting occupation-specific challenges could lead to more successful measures. 
-            
-Future research should explore how specific occupational characteristics interact with sleep and lifestyle behaviors to influence overall health outcomes, as well as how improvements in sleep quality and general health can enhance workplace productivity and performance.
+# figure cache counters
+cache_stats = figures.stats()
+st.sidebar.caption(
+    f"Figure cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+    f"{cache_stats['size']}/{cache_stats['maxsize']} stored"
+)
 
-""")
+# stage timings are logged as json lines on every rerun; the panel is optional
+timer.finish()
+if st.sidebar.checkbox("Show performance panel"):
+    st.sidebar.markdown(f"**Rerun {timer.run_id}:** {timer.total_ms():.0f} ms")
+    st.sidebar.dataframe(timer.records, hide_index=True)
 
 # Footer
 st.markdown("""
 <div style="text-align: center; font-size: 0.8em;">
     © 2025 Sara Latorre – Built using Streamlit  
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# cohorts that failed to load
+for name, (_, job) in cohort_jobs.items():
+    if job.done() and job.exception() is not None:
+        st.sidebar.warning(f"Cohort {name} could not be loaded: {job.exception()}")
+
+# while cohorts are still loading, check on them every second without holding up the
+# page (a fragment rerunning on its own) and repaint once one has finished; the next
+# run with nothing pending stops the polling
+@st.fragment(run_every=1)
+def watch_cohorts(jobs):
+    if any(job.done() for job in jobs):
+        st.rerun()
+
+pending_cohorts = [job for _, job in cohort_jobs.values() if not job.done()]
+if pending_cohorts:
+    watch_cohorts(pending_cohorts)
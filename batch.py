@@ -0,0 +1,47 @@
+import argparse
+import glob
+
+import pandas as pd
+
+from aggregates import BACKEND, BACKENDS, question_tables, summarize_shards
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Aggregate many survey csv shards (one per site/month) in parallel"
+    )
+    parser.add_argument("patterns", nargs="+", help="shard files or glob patterns, e.g. 'data/*.csv'")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--chunksize", type=int, help="stream each shard in chunks of this many rows")
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND, help="aggregation engine (default: $HEALTH_BACKEND or pandas)")
+    args = parser.parse_args()
+
+    # expand the globs, keeping each shard once
+    paths = sorted({path for pattern in args.patterns for path in glob.glob(pattern)})
+    if not paths:
+        parser.error("no shard files match " + " ".join(args.patterns))
+
+    summary = summarize_shards(paths, workers=args.workers, chunksize=args.chunksize, backend=args.backend)
+    tables = question_tables(summary)
+
+    print(f"{len(paths)} shards, {int(summary.counts.sum())} respondents")
+
+    with pd.option_context("display.width", 120, "display.max_columns", None, "display.precision", 1):
+        print("\n=== Sleep Disorders by Occupation (%) ===")
+        print(tables["disorders"])
+        print("\n=== Average Stress, Sleep and Physical Activity ===")
+        print(tables["stress_sleep"])
+        print("\n=== BMI Categories by Occupation (%) ===")
+        print(tables["bmi"])
+        print("\n=== Average Age by Occupation ===")
+        print(tables["age"])
+        print("\n=== Gender by Occupation (%) ===")
+        print(tables["gender"])
+        print("\n=== Blood Pressure Stage by Occupation (%) ===")
+        print(tables["bp"])
+        print("\n=== Average Heart Rate, Stress, Steps and Sleep Quality ===")
+        print(tables["cardio"])
+
+
+if __name__ == "__main__":
+    main()
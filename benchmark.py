@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+
+from aggregates import summarize
+from charts import (
+    bmi_figure, bmi_table, disorder_figure, disorder_table, figure_bytes,
+    sleep_bmi_figure, sleep_bmi_table, stress_figure, stress_table
+)
+from dataset import DATA_FILE, SCHEMA, prepare
+
+# numeric columns jittered when the dataset is replicated, with their valid range
+JITTER = {
+    "Age": (2, 18, 90),
+    "Sleep Duration": (0.2, 3.0, 10.0),
+    "Quality of Sleep": (1, 1, 10),
+    "Physical Activity Level": (5, 0, 100),
+    "Stress Level": (1, 1, 10),
+    "Heart Rate": (3, 40, 120),
+    "Daily Steps": (500, 0, 30000)
+}
+
+
+# replicate the shipped rows `scale` times and jitter the numeric columns
+def scaled_dataset(base, scale, seed=0):
+    rng = np.random.default_rng(seed)
+    df = base.loc[base.index.repeat(scale)].reset_index(drop=True)
+    df["Person ID"] = np.arange(1, len(df) + 1)
+    for column, (spread, low, high) in JITTER.items():
+        values = df[column].to_numpy(dtype="float64") + rng.normal(0, spread, len(df))
+        values = np.clip(values, low, high)
+        df[column] = values.round(1) if column == "Sleep Duration" else values.round().astype("int64")
+    return df
+
+
+# best wall time over `repeat` untraced runs, then one run under tracemalloc for peak memory
+def measure(stage, setup, run, repeat):
+    times = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        run(*args)
+        times.append(time.perf_counter() - start)
+
+    args = setup()
+    tracemalloc.start()
+    run(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"stage": stage, "seconds": min(times), "peak_mb": peak / 1e6}
+
+
+def filter_occupations(df):
+    valid_jobs = df["Occupation"].value_counts()[lambda x: x >= 5].index
+    return df[df["Occupation"].isin(valid_jobs)]
+
+
+def render_all(summary, labels):
+    selected = ["Overweight", "Obese"]
+    figure_bytes(disorder_figure(disorder_table(summary, labels)))
+    figure_bytes(stress_figure(stress_table(summary, labels), ["Stress Level", "Sleep Duration", "Quality of Sleep"]))
+    figure_bytes(bmi_figure(bmi_table(summary, labels, selected), selected))
+    figure_bytes(sleep_bmi_figure(sleep_bmi_table(summary, labels)))
+
+
+# every stage the dashboard and the analysis script run, on one scaled csv
+def run_stages(path, repeat):
+    raw = pd.read_csv(path, dtype=SCHEMA)
+    df = prepare(raw.copy())
+    filtered = filter_occupations(df)
+    cube = summarize(df)
+    summary = cube.select(cube.eligible(5))
+    labels = summary.occupations.tolist()
+    selected = ["Overweight", "Obese"]
+
+    stages = [
+        ("csv_load", lambda: (path,), lambda p: pd.read_csv(p, dtype=SCHEMA)),
+        ("clean", lambda: (raw.copy(),), prepare),
+        ("filter_occupations", lambda: (df,), filter_occupations),
+        ("summarize", lambda: (filtered,), summarize),
+        ("q1_disorders", lambda: (summary, labels), disorder_table),
+        ("q2_stress_sleep", lambda: (summary, labels), stress_table),
+        ("q3_bmi", lambda: (summary, labels, selected), bmi_table),
+        ("ext_sleep_bmi", lambda: (summary, labels), sleep_bmi_table),
+        ("render", lambda: (summary, labels), render_all)
+    ]
+    return [measure(name, setup, run, repeat) for name, setup, run in stages]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time and memory-profile each pipeline stage at scaled dataset sizes")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 100, 10000], help="multiples of the shipped dataset")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (best is kept)")
+    parser.add_argument("--data", default=DATA_FILE, help="dataset to scale up")
+    parser.add_argument("--output", default="benchmark_results.json", help="json file for the results")
+    args = parser.parse_args()
+
+    base = pd.read_csv(args.data)
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            path = os.path.join(tmp, f"scaled_{scale}.csv")
+            scaled_dataset(base, scale).to_csv(path, index=False)
+            rows = len(base) * scale
+
+            for result in run_stages(path, args.repeat):
+                result.update(scale=scale, rows=rows)
+                results.append(result)
+                print(f"{scale:>6}x {rows:>10} rows  {result['stage']:<20} {result['seconds']:9.4f}s  {result['peak_mb']:9.1f} MB")
+            os.remove(path)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "argv": sys.argv[1:],
+        "results": results
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
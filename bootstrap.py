@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+# resamples per interval; enough for stable 2.5/97.5 percentiles
+RESAMPLES = 1000
+
+
+# resampling an occupation's n respondents with replacement gives category counts
+# distributed Multinomial(n, observed shares), so every (resample, occupation, category)
+# count is drawn directly: the cost depends on the table size, not on the respondents
+def resample_counts(counts, resamples, seed):
+    rng = np.random.default_rng(seed)
+    values = counts.to_numpy(dtype="int64")
+    sizes = values.sum(axis=1)
+    # an empty occupation draws nothing, whatever its (undefined) shares
+    shares = np.where(sizes[:, None] > 0, values / np.maximum(sizes, 1)[:, None], 1 / max(values.shape[1], 1))
+    return rng.multinomial(sizes, shares, size=(resamples, len(sizes))), sizes
+
+
+# bootstrap shares of each category within each occupation (resampling respondents
+# within their occupation)
+class BootstrapRates:
+    def __init__(self, counts, resamples=RESAMPLES, seed=0):
+        self.occupations = counts.index
+        self.categories = counts.columns
+        resampled, sizes = resample_counts(counts, resamples, seed)
+        totals = np.maximum(sizes, 1)[None, :, None]
+        self.pct = resampled / totals * 100   # resamples x occupations x categories
+
+    # percentile interval of the combined share of `categories` for each occupation
+    def interval(self, labels, categories, level=0.95):
+        rows = self.occupations.get_indexer(labels)
+        columns = [self.categories.get_loc(c) for c in categories if c in self.categories]
+        share = self.pct[:, rows][:, :, columns].sum(axis=2)
+        tail = (1 - level) / 2 * 100
+        low, high = np.percentile(share, [tail, 100 - tail], axis=0)
+        return pd.DataFrame({"low": low, "high": high}, index=pd.Index(labels, name=self.occupations.name))
@@ -0,0 +1,333 @@
+import io
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+from dataset import BP_STAGES
+
+width = 0.25 # width of each bar
+
+DISORDERS = ["Insomnia", "Sleep Apnea", "No Disorder"]
+METRICS = ["Stress Level", "Sleep Duration", "Quality of Sleep"]
+
+# blood pressure stages from green (normal) to red (stage 2)
+BP_COLORS = ["#2ca02c", "#bcbd22", "#ff7f0e", "#d62728"]
+
+
+# small per-occupation tables behind each dashboard chart
+
+# percentage of each occupation in each sleep disorder category, plus
+# "<disorder> low"/"<disorder> high" bootstrap bounds when `rates` is given
+def disorder_table(summary, labels, rates=None):
+    disorder_pct = summary.category_pct("Sleep Disorder")
+    table = disorder_pct.reindex(index=labels, columns=DISORDERS).fillna(0)
+    if rates is not None:
+        for disorder in DISORDERS:
+            bounds = rates.interval(labels, [disorder])
+            table[disorder + " low"] = bounds["low"]
+            table[disorder + " high"] = bounds["high"]
+    return table
+
+
+# mean stress, sleep and physical activity per occupation
+def stress_table(summary, labels):
+    return summary.means.reindex(labels)[METRICS + ["Physical Activity Level"]]
+
+
+# combined share of the selected BMI categories (with "BMI % low"/"BMI % high"
+# bootstrap bounds when `rates` is given), average age and dominant gender
+def bmi_table(summary, labels, selected_bmi, rates=None):
+    bmi_counts = summary.category_counts("BMI Category").reindex(labels).fillna(0)
+    bmi_pct = bmi_counts.div(bmi_counts.sum(axis=1), axis=0) * 100
+
+    # add together selected categories (default: Overweight + Obese)
+    bmi_combined = pd.Series([0.0]*len(labels), index=labels)
+    for category in selected_bmi:
+        if category in bmi_pct.columns:
+            bmi_combined += bmi_pct[category]
+
+    gender_counts = summary.category_counts("Gender").reindex(labels).fillna(0)
+    gender_pct = gender_counts.div(gender_counts.sum(axis=1), axis=0) * 100
+    male_pct = gender_pct["Male"] if "Male" in gender_pct.columns else pd.Series(0, index=labels)
+    female_pct = gender_pct["Female"] if "Female" in gender_pct.columns else pd.Series(0, index=labels)
+    gender_label = [
+        f"{m:.0f}% M" if m > f else f"{f:.0f}% F" for m, f in zip(male_pct, female_pct)
+    ]
+
+    table = pd.DataFrame({
+        "BMI %": bmi_combined,
+        "Average Age": summary.means["Age"].reindex(labels),
+        "Gender": gender_label
+    }, index=labels)
+    if rates is not None:
+        bounds = rates.interval(labels, selected_bmi)
+        table["BMI % low"] = bounds["low"]
+        table["BMI % high"] = bounds["high"]
+    return table
+
+
+# % overweight + obese against average sleep quality and duration
+def sleep_bmi_table(summary, labels):
+    bmi_percent = summary.category_pct("BMI Category")
+    bmi_overweight_obese = (
+        bmi_percent.get("Overweight", pd.Series(0, index=bmi_percent.index)) +
+        bmi_percent.get("Obese", pd.Series(0, index=bmi_percent.index))
+    ).reindex(labels).fillna(0)
+
+    means = summary.means.reindex(labels)
+    return pd.DataFrame({
+        "Quality of Sleep": means["Quality of Sleep"],
+        "Sleep Duration": means["Sleep Duration"],
+        "% Overweight + Obese": bmi_overweight_obese
+    }, index=labels)
+
+
+# percentage of each occupation in each blood pressure stage (staged once at load time)
+def bp_table(summary, labels):
+    return summary.category_pct("BP Stage").reindex(index=labels, columns=BP_STAGES, fill_value=0)
+
+
+# average heart rate and stress, daily steps and sleep quality
+def heart_table(summary, labels):
+    return summary.means.reindex(labels)[["Stress Level", "Heart Rate", "Quality of Sleep", "Daily Steps"]]
+
+
+# 1. Sleep disorder distribution by occupation bar chart
+def disorder_figure(table):
+    labels = table.index.tolist()
+    x = np.arange(len(labels))
+    insomnia = table["Insomnia"].tolist()
+    sleep_apnea = table["Sleep Apnea"].tolist()
+    no_disorder = table["No Disorder"].tolist()
+
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+
+    # plot each category of sleep disorder (with 95% bootstrap intervals when available)
+    ax.bar(x - width, insomnia, width, label="Insomnia", yerr=error_bars(table, "Insomnia"), capsize=2)
+    ax.bar(x, sleep_apnea, width, label="Sleep Apnea", yerr=error_bars(table, "Sleep Apnea"), capsize=2)
+    ax.bar(x + width, no_disorder, width, label="No Disorder", yerr=error_bars(table, "No Disorder"), capsize=2)
+
+    # chart title, labels & legend
+    ax.set_title("Sleep Disorders by Occupation (%)")
+    ax.set_ylabel("Percentage")
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels, rotation=45)
+    ax.set_ylim(0, 100)
+    ax.legend()
+
+    # add percentage labels above each bar (and its error bar)
+    tops = {
+        disorder: table.get(disorder + " high", table[disorder]).tolist() for disorder in DISORDERS
+    }
+    for i in range(len(labels)):
+        ax.text(x[i] - width, tops["Insomnia"][i] + 0.5, f"{insomnia[i]:.1f}%", ha="center", va="bottom", fontsize=8)
+        ax.text(x[i], tops["Sleep Apnea"][i] + 0.5, f"{sleep_apnea[i]:.1f}%", ha="center", va="bottom", fontsize=8)
+        ax.text(x[i] + width, tops["No Disorder"][i] + 0.5, f"{no_disorder[i]:.1f}%", ha="center", va="bottom", fontsize=8)
+
+    return fig
+
+
+# 2. Stress, sleep duration and sleep quality bars with physical activity on a twin axis
+def stress_figure(table, selected_metrics):
+    labels = table.index.tolist()
+    x = np.arange(len(labels))
+
+    fig = Figure(figsize=(10, 6))
+    ax1 = fig.subplots()
+
+    # offsets for bar positioning
+    offsets = {
+        "Stress Level": -width,
+        "Sleep Duration": 0,
+        "Quality of Sleep": width
+    }
+
+    # plot only selected bars
+    for metric in METRICS:
+        if metric in selected_metrics:
+            ax1.bar(x + offsets[metric], table[metric], width, label=metric)
+
+    # bar axis settings
+    ax1.set_ylabel("Scale (0–10)")
+    ax1.set_ylim(0, 10)
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(labels, rotation=45)
+    ax1.set_title("Stress, Sleep, and Physical Activity by Occupation")
+
+    # line chart on twin axis
+    ax2 = ax1.twinx()
+    ax2.plot(x, table["Physical Activity Level"], label="Physical Activity", color="tab:red", marker="o", linewidth=2)
+    ax2.set_ylim(0, 100)
+    ax2.set_ylabel("Physical Activity Level (0–100)")
+
+    # combine legends
+    lines_1, labels_1 = ax1.get_legend_handles_labels()
+    lines_2, labels_2 = ax2.get_legend_handles_labels()
+    ax1.legend(lines_1 + lines_2, labels_1 + labels_2, loc='upper left')
+
+    return fig
+
+
+# 3. BMI category share by occupation with average age on a secondary axis
+def bmi_figure(table, selected_bmi):
+    labels = table.index.tolist()
+    x = np.arange(len(labels))
+    bmi_combined = table["BMI %"]
+    age_by_occupation = table["Average Age"]
+
+    fig = Figure(figsize=(10, 6))
+    ax1 = fig.subplots()
+    ax1.bar(x, bmi_combined, color='steelblue', yerr=error_bars(table, "BMI %"), capsize=3)
+    ax1.set_ylabel("% " + " + ".join(selected_bmi) if selected_bmi else "BMI %")
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(labels, rotation=45)
+    tops = table.get("BMI % high", bmi_combined)
+    y_max = tops.max() if selected_bmi else 1
+    ax1.set_ylim(0, y_max + 10)
+    ax1.set_title("BMI Rate vs Age by Occupation")
+
+    # Gender label annotations
+    for i, label in enumerate(table["Gender"]):
+        ax1.text(i, tops.iloc[i] + 2, label, ha='center', va='bottom', fontsize=9)
+
+    # Secondary axis: average age
+    ax2 = ax1.twinx()
+    ax2.plot(x, age_by_occupation, color="tab:red", marker='o', linewidth=2, label="Average Age")
+    ax2.set_ylabel("Average Age")
+    ax2.set_ylim(age_by_occupation.min() * 0.95, age_by_occupation.max() * 1.05)
+
+    # Combine legends
+    lines_1, labels_1 = ax1.get_legend_handles_labels()
+    lines_2, labels_2 = ax2.get_legend_handles_labels()
+    ax1.legend(lines_1 + lines_2, labels_1 + labels_2, loc='upper right')
+
+    return fig
+
+
+# 4. BMI vs sleep quality and sleep duration scatter plots
+def sleep_bmi_figure(table):
+    labels = table.index.tolist()
+    bmi_overweight_obese = table["% Overweight + Obese"]
+
+    fig = Figure(figsize=(12, 5))
+    ax = fig.subplots(1, 2)
+
+    # BMI vs Sleep Quality
+    ax[0].scatter(table["Quality of Sleep"], bmi_overweight_obese)
+    for i, occ in enumerate(labels):
+        ax[0].annotate(occ, (table["Quality of Sleep"].iloc[i], bmi_overweight_obese.iloc[i]), fontsize=8)
+    ax[0].set_xlabel("Average Sleep Quality")
+    ax[0].set_ylabel("% Overweight + Obese")
+    ax[0].set_title("BMI vs Sleep Quality")
+
+    # BMI vs Sleep Duration
+    ax[1].scatter(table["Sleep Duration"], bmi_overweight_obese)
+    for i, occ in enumerate(labels):
+        ax[1].annotate(occ, (table["Sleep Duration"].iloc[i], bmi_overweight_obese.iloc[i]), fontsize=8)
+    ax[1].set_xlabel("Average Sleep Duration (hrs)")
+    ax[1].set_ylabel("% Overweight + Obese")
+    ax[1].set_title("BMI vs Sleep Duration")
+
+    fig.tight_layout()
+    return fig
+
+
+# 5. Blood pressure stage by occupation, stacked to 100%
+def bp_figure(table):
+    labels = table.index.tolist()
+    x = np.arange(len(labels))
+
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+
+    bottom = np.zeros(len(labels))
+    for stage, color in zip(BP_STAGES, BP_COLORS):
+        share = table[stage].to_numpy()
+        ax.bar(x, share, 0.6, bottom=bottom, label=stage, color=color)
+        # label the segments big enough to hold their percentage
+        for i in np.flatnonzero(share >= 8):
+            ax.text(x[i], bottom[i] + share[i] / 2, f"{share[i]:.0f}%", ha="center", va="center", fontsize=8)
+        bottom += share
+
+    ax.set_title("Blood Pressure Stage by Occupation (%)")
+    ax.set_ylabel("Percentage")
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels, rotation=45)
+    ax.set_ylim(0, 100)
+    ax.legend(title="BP Stage", bbox_to_anchor=(1.01, 1), loc="upper left")
+
+    return fig
+
+
+# 5. Heart rate vs stress and daily steps vs sleep quality scatter plots
+def heart_figure(table):
+    labels = table.index.tolist()
+
+    fig = Figure(figsize=(12, 5))
+    ax = fig.subplots(1, 2)
+
+    # Heart Rate vs Stress
+    ax[0].scatter(table["Stress Level"], table["Heart Rate"], color="tab:red")
+    for i, occ in enumerate(labels):
+        ax[0].annotate(occ, (table["Stress Level"].iloc[i], table["Heart Rate"].iloc[i]), fontsize=8)
+    ax[0].set_xlabel("Average Stress Level")
+    ax[0].set_ylabel("Average Heart Rate (bpm)")
+    ax[0].set_title("Heart Rate vs Stress")
+
+    # Daily Steps vs Sleep Quality
+    ax[1].scatter(table["Daily Steps"], table["Quality of Sleep"])
+    for i, occ in enumerate(labels):
+        ax[1].annotate(occ, (table["Daily Steps"].iloc[i], table["Quality of Sleep"].iloc[i]), fontsize=8)
+    ax[1].set_xlabel("Average Daily Steps")
+    ax[1].set_ylabel("Average Sleep Quality")
+    ax[1].set_title("Sleep Quality vs Daily Steps")
+
+    fig.tight_layout()
+    return fig
+
+
+# cohort comparison: one panel per metric, a bar per cohort within each occupation
+def cohort_figure(table, title, ylabel):
+    labels = list(dict.fromkeys(table["Occupation"]))
+    cohorts = list(dict.fromkeys(table["Cohort"]))
+    metrics = list(dict.fromkeys(table["Metric"]))
+    x = np.arange(len(labels))
+    bar = 0.8 / len(cohorts)
+
+    fig = Figure(figsize=(max(7, 4.5 * len(metrics)), 4.5))
+    axes = fig.subplots(1, len(metrics), squeeze=False)
+    for ax, metric in zip(axes[0], metrics):
+        values = table[table["Metric"] == metric].pivot(index="Occupation", columns="Cohort", values="Value")
+        values = values.reindex(index=labels, columns=cohorts)
+        for i, cohort in enumerate(cohorts):
+            ax.bar(x + (i - (len(cohorts) - 1) / 2) * bar, values[cohort], bar, label=cohort)
+        ax.set_title(metric)
+        ax.set_xticks(x)
+        ax.set_xticklabels(labels, rotation=45, ha="right")
+
+    axes[0][0].set_ylabel(ylabel)
+    axes[0][0].legend(title="Cohort")
+    fig.suptitle(title)
+    fig.tight_layout()
+    return fig
+
+
+# asymmetric matplotlib error bars from a table's "<column> low"/"<column> high" bounds
+def error_bars(table, column):
+    if column + " low" not in table.columns:
+        return None
+    return [
+        (table[column] - table[column + " low"]).clip(lower=0),
+        (table[column + " high"] - table[column]).clip(lower=0)
+    ]
+
+
+# rasterize a figure the same way st.pyplot does; figures are plain Figure objects,
+# never registered with pyplot, so they can be drawn on several threads at once and
+# are freed with their last reference
+def figure_bytes(fig, fmt="png"):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, bbox_inches="tight", dpi=200)
+    return buffer.getvalue()
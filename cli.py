@@ -0,0 +1,138 @@
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+
+# only the standard library is imported up front; pandas comes in with the data and
+# matplotlib only when a chart is asked for
+STARTED = time.perf_counter()
+
+# same defaults as dataset.DATA_FILE and aggregates.BACKENDS, which would pull in pandas
+DATA_FILE = "Sleep_health_and_lifestyle_dataset.csv"
+BACKENDS = ["pandas", "duckdb"]
+
+# title and table (from aggregates.question_tables) of each subcommand
+QUESTIONS = {
+    "disorders": ("Sleep Disorders by Occupation (%)", lambda tables: tables["disorders"]),
+    "stress": ("Average Stress, Sleep and Physical Activity", lambda tables: tables["stress_sleep"]),
+    "bmi": (
+        "BMI Categories (%), Gender (%) and Average Age by Occupation",
+        lambda tables: tables["bmi"].join(tables["gender"]).assign(**{"Average Age": tables["age"]})
+    ),
+    "sleep-vs-bmi": ("Sleep Quality and Duration vs % Overweight + Obese", lambda tables: tables["sleep_bmi"]),
+    "cardio": (
+        "Blood Pressure Stage (%), Heart Rate, Stress, Steps and Sleep Quality by Occupation",
+        lambda tables: tables["bp"].join(tables["cardio"])
+    )
+}
+
+# milliseconds spent on each deferred import and each step, for --timings
+timings = {}
+
+
+def need(name):
+    if name not in sys.modules:
+        start = time.perf_counter()
+        importlib.import_module(name)
+        timings["import " + name] = (time.perf_counter() - start) * 1000
+    return sys.modules[name]
+
+
+def step(name, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    timings[name] = (time.perf_counter() - start) * 1000
+    return result
+
+
+# the dashboard's charts for a question, without error bars, as (file name suffix,
+# figure) pairs: cardio has a second chart, saved next to the first with "-heart";
+# charts.py builds plain matplotlib Figures, so pyplot is never initialized
+def figures(question, summary):
+    charts = need("charts")
+    labels = summary.occupations.tolist()
+    if question == "disorders":
+        return [("", charts.disorder_figure(charts.disorder_table(summary, labels)))]
+    if question == "stress":
+        return [("", charts.stress_figure(charts.stress_table(summary, labels), charts.METRICS))]
+    if question == "bmi":
+        categories = ["Overweight", "Obese"]
+        return [("", charts.bmi_figure(charts.bmi_table(summary, labels, categories), categories))]
+    if question == "cardio":
+        return [
+            ("", charts.bp_figure(charts.bp_table(summary, labels))),
+            ("-heart", charts.heart_figure(charts.heart_table(summary, labels)))
+        ]
+    return [("", charts.sleep_bmi_figure(charts.sleep_bmi_table(summary, labels)))]
+
+
+def render(table, title, fmt, csv, respondents):
+    if fmt == "json":
+        return json.dumps({
+            "question": title,
+            "csv": csv,
+            "respondents": respondents,
+            "table": table.round(2).to_dict(orient="index")
+        }, indent=2)
+    if fmt == "csv":
+        return table.round(2).to_csv()
+    with need("pandas").option_context("display.width", 120, "display.max_columns", None):
+        return f"=== {title} ===\n{table.round(1)}"
+
+
+def run(args):
+    need("numpy")
+    need("pandas")
+    aggregates = need("aggregates")
+    cube = step("summarize", aggregates.summarize_file, args.csv, args.chunksize, args.backend)
+    tables = step("tables", aggregates.question_tables, cube, args.min_count)
+    title, pick = QUESTIONS[args.question]
+    print(step("format", render, pick(tables), title, args.format, args.csv, int(cube.counts.sum())))
+
+    if args.plot:
+        summary = cube.select(sorted(cube.eligible(args.min_count)))
+        drawn = step("draw", figures, args.question, summary)
+        stem, ext = os.path.splitext(args.plot)
+        fmt = ext.lstrip(".") or "png"
+        for suffix, fig in drawn:
+            step("save" + suffix, fig.savefig, stem + suffix + ext, format=fmt, bbox_inches="tight")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Answer one research question from the command line (fast startup for scripts and cron)"
+    )
+    parser.add_argument("--timings", action="store_true", help="report import and step times (ms) on stderr")
+    questions = parser.add_subparsers(dest="question", required=True, metavar="question")
+    for name, (title, _) in QUESTIONS.items():
+        question = questions.add_parser(name, help=title.replace("%", "%%"))
+        question.add_argument("csv", nargs="?", default=DATA_FILE, help="survey csv to analyze")
+        question.add_argument("--format", choices=["text", "json", "csv"], default="text", help="stdout format")
+        question.add_argument(
+            "--plot", help="also save the chart to this file (.png or .svg; cardio adds NAME-heart.EXT); loads matplotlib"
+        )
+        question.add_argument("--min-count", type=int, default=5, help="skip occupations with fewer respondents")
+        question.add_argument("--chunksize", type=int, help="stream the csv in chunks of this many rows")
+        question.add_argument(
+            "--backend", choices=BACKENDS, default=os.environ.get("HEALTH_BACKEND", "pandas"),
+            help="aggregation engine (default: $HEALTH_BACKEND or pandas)"
+        )
+    args = parser.parse_args(argv)
+
+    try:
+        run(args)
+    except BrokenPipeError:
+        # the reader went away (e.g. `| head`); don't let the final flush complain too
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+
+    if args.timings:
+        for name, ms in timings.items():
+            print(f"{name:>20}: {ms:8.1f} ms", file=sys.stderr)
+        print(f"{'total':>20}: {(time.perf_counter() - STARTED) * 1000:8.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import glob
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from aggregates import summarize_file
+from dataset import file_stamp
+
+# extra cohorts to compare against, one "name=path" per line (or comma separated), and
+# a directory whose csv files are offered too; both are server config, visitors only
+# pick from them
+COHORTS = os.environ.get("HEALTH_COHORTS", "")
+COHORT_DIR = os.environ.get("HEALTH_COHORT_DIR", "")
+
+
+# "2024=exports/2024.csv" lines -> {name: path}; a bare path is named after its file
+def parse_cohorts(text):
+    cohorts = {}
+    for line in text.replace(",", "\n").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        name, _, path = line.rpartition("=")
+        path = path.strip()
+        cohorts[name.strip() or os.path.splitext(os.path.basename(path))[0]] = path
+    return cohorts
+
+
+# {name: path} of every configured cohort: the HEALTH_COHORTS entries plus the csv
+# files in HEALTH_COHORT_DIR (named after the file), which is re-listed on each call
+# so exports dropped there show up without a restart
+def available_cohorts(text=COHORTS, directory=COHORT_DIR):
+    cohorts = {}
+    if directory:
+        for path in sorted(glob.glob(os.path.join(directory, "*.csv"))):
+            cohorts[os.path.splitext(os.path.basename(path))[0]] = path
+    cohorts.update(parse_cohorts(text))
+    return cohorts
+
+
+# summarizes cohort files on a thread pool; each cohort is cached on its own, keyed
+# by path, size and mtime, so adding or changing one never reloads the others; only
+# the `maxsize` most recently used cohorts are kept
+class CohortLoader:
+    def __init__(self, workers=4, backend=None, maxsize=16):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cohort")
+        self.backend = backend
+        self.maxsize = maxsize
+        self.jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    # (version, future of the cohort's OccupationSummary), started now unless already cached
+    def submit(self, path):
+        path = os.path.abspath(path)
+        version = file_stamp(path)
+        with self._lock:
+            cached = self.jobs.get(path)
+            if cached is None or cached[0] != version:
+                cached = (version, self.pool.submit(summarize_file, path, None, self.backend))
+                self.jobs[path] = cached
+            self.jobs.move_to_end(path)
+            while len(self.jobs) > self.maxsize:
+                self.jobs.popitem(last=False)
+        return cached
+
+
+# one per-occupation table per cohort (built by `table(summary)`) stacked into long
+# form: Cohort, Occupation, Metric, Value
+def cohort_table(summaries, labels, table):
+    frames = {
+        name: table(summary).reindex(labels).rename_axis(index="Occupation", columns="Metric")
+        for name, summary in summaries.items()
+    }
+    wide = pd.concat(frames, names=["Cohort"])
+    return wide.stack(future_stack=True).rename("Value").reset_index()
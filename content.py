@@ -0,0 +1,177 @@
+# headings, introductions and conclusions shared by the dashboard (app.py) and the
+# static report (report.py), so both always show the same text
+
+TITLE = "Workplace Health Lifestyle Data Analysis"
+
+# 1. Sleep disorders by occupation
+Q1_TITLE = "Question 1: Which occupations report the highest percentage of sleep disorders?"
+Q1_INTRO = """
+This section analyzes which professions report the **highest prevalence of sleep disorders**.
+
+The chart below displays the **percentage distribution** of each sleep disorder (or lack thereof) across occupations.  
+This helps highlight whether certain jobs are more strongly associated with sleep-related health issues.
+"""
+
+Q1_CONCLUSION = """
+→ **Sales workers** are the **most affected by sleep disorders**:  
+- **85.3%** report **insomnia**  
+- **8.8%** report **sleep apnea**  
+- Only **5.9%** report **no disorder**
+            
+
+→ **Nurses** have the **highest rate of sleep apnea** by far (**83.6%**), significantly exceeding all other professions (ranging from 0% to ~10%).
+
+→ **Teachers** also show **high insomnia prevalence** (**67.5%**), and only **22.5%** report **no disorder**.
+
+→ In contrast, **Doctors, Engineers, Accountants, and Lawyers** show the **lowest disorder rates**, with **over 80%** in each group reporting **no sleep disorder**.
+"""
+
+
+# 2. Stress and sleep
+Q2_TITLE = "Question 2: Do occupations with higher stress levels also report lower sleep quality or fewer sleep hours?"
+Q2_INTRO = """
+This analysis examines whether occupations with **higher average stress levels** also tend to report **lower sleep quality** or **shorter sleep duration**.
+
+The chart below compares **stress levels**, **sleep duration**, and **sleep quality** across professions.  
+While the focus is on stress and sleep, **physical activity** is included as a secondary factor to observe whether it may also play a role in sleep health or if **stress remains the stronger predictor**.
+"""
+
+Q2_CONCLUSION = """
+
+There’s a clear correlation between **higher stress** and **poorer sleep health**.
+
+→ **Sales workers** report the **highest stress level** (**7.1**), **lowest sleep duration** (**6.4 hours**), and **worst sleep quality** (**5.9**).
+
+→ **Doctors** also show **high stress** (**6.7**) and **poor sleep quality** (**6.6**), although their sleep duration is slightly better (**7 hours**).            
+
+→ **Engineers**, on the other hand, report the **lowest stress** (**4.0**), **highest sleep duration** (**7.9 hours**), and **best sleep quality** (**8.3**).
+            
+**Physical Activity Comparison**  
+- **Most Active:** Nurses (78.6), Lawyers (70.4)  
+- **Least Active:** Engineers (51.6), Sales Workers (44.1)
+            
+→ Interestingly, **physical activity levels** appear to vary independently as **nurses (78.6)** and **lawyers (70.4)** report the highest activity, while **engineers (51.6)** and **sales workers (44.1)** are less active. Despite lower activity, engineers report excellent sleep, which may mean **stress has a stronger influence on sleep health** than physical activity alone.
+"""
+
+
+# 3. BMI, age and gender
+Q3_TITLE = "Question 3: Are there noticeable differences in BMI category distribution across occupations?"
+Q3_INTRO = """
+This analysis investigates how rates of **overweight** and **obesity** vary across different occupations.  
+Since both **age** and **gender** are known to influence body mass index, we include them as important factors to contextualize the BMI differences observed.
+
+- **Age** affects metabolism and fat distribution, often increasing BMI as people get older ([Jura M, Kozak LP., 2016](https://pmc.ncbi.nlm.nih.gov/articles/PMC5005878/)).  
+- **Gender** influences body composition and fat patterns, with different prevalence of overweight/obesity between genders ([Koceva A, Herman R, Janez A, Rakusa M, Jensterle M., 2024](https://pmc.ncbi.nlm.nih.gov/articles/PMC11242171/)).
+
+By examining BMI together with average age and gender distribution, we can better understand the patterns by occupation in weight variations and identify whether age or gender alone can explain these differences.
+"""
+
+Q3_CONCLUSION = """
+→ **Sales workers, nurses, and teachers** exhibit the **highest rates of overweight and obesity** (ranging between **85% and 100%** of participants).
+
+→ **Doctors, engineers, and lawyers** tend to maintain **predominantly healthy BMI levels**.
+
+→ **Age and physical activity alone do not fully explain BMI differences**:  
+- Nurses have the **highest physical activity levels** but still poor BMI outcomes.  
+- Engineers are on average **older** and moderately active (**51.6**), yet maintain healthy weights.
+
+→ This suggests **other factors** such as **sleep quality, stress, or working conditions** may significantly influence BMI.
+
+→ Regarding **gender distribution**:  
+- Occupations with higher overweight/obesity rates are often **female-dominated** (e.g., nurses, teachers).  
+- However, sales (a **male-dominated field**) also reports very poor BMI results, indicating gender alone does **not fully explain** the differences.
+
+"""
+
+
+# extended conclusion: BMI and sleep
+EXT_TITLE = "Extended Conclusion: Revisiting BMI with Sleep as a Key Factor"
+EXT_INTRO = """**Additional question:** *What if sleep quality and sleep duration were stronger predictors of BMI than gender or age?*
+
+While the initial analysis of question n°3 showed clear differences in BMI across occupations,  
+factors like **age**, **gender**, and **physical activity** offered only **partial explanations**.
+            
+This section explores the relationship between BMI rates and sleep metrics (quality and duration) across occupations.            
+"""
+
+CORRELATION_INTRO = """
+The scatter plots compare occupation averages. The matrix below correlates every numeric field **respondent by respondent**
+(BMI as an ordinal scale: Normal Weight < Overweight < Obese), for everyone or within one occupation.
+"""
+
+EXT_CONCLUSION = """
+By comparing the percentage of overweight and obese individuals in each occupation with their average sleep quality and duration, we can observe the following patterns:
+
+→ **Sales Workers** suffer from the **worst sleep quality** (5.9) and **shortest sleep duration** (6.4 hours),  
+resulting in the **highest overweight/obesity rates** (~100%).
+
+→ **Teachers and Nurses** experience **poor sleep health** (quality between 6.3–6.4 and about 6.6 hours sleep),  
+with **very high BMI issues** (~85%–90%).
+
+→ **Engineers and Lawyers** enjoy the **best sleep health** (quality between 7.8–8.3 and 7.6–7.9 hours sleep),  
+and have the **healthiest BMI profiles**.
+
+→ **Doctors are an exception**: despite **poorer sleep quality than engineers** (6.6 quality, 7.0 hours),  
+they maintain better BMI results, likely due to **protective factors** such as:  
+- Medical knowledge  
+- Healthier lifestyle habits  
+- Better dietary choices
+
+→ ** What it demonstrates:** 
+Sleep metrics (quality and hours) appear to better align with BMI patterns than other factors.
+Occupations with poor sleep tend to have worse BMI outcomes. Additionally, the results also suggest that possible protective factors can also play a strong role in BMI results.
+"""
+
+
+# cardiovascular question
+CARDIO_TITLE = "Question 4: Do blood pressure, heart rate and daily steps follow the same occupational patterns?"
+CARDIO_INTRO = """Each respondent's blood pressure reading (e.g. "126/83") is staged once when the data is loaded, using the ACC/AHA categories:  
+**Normal** (below 120/80), **Elevated** (120–129 and below 80), **Stage 1** (130–139 or 80–89) and **Stage 2** (140 or more, or 90 or more).
+Respondents without a reading are left out of the stage percentages.
+
+The scatter plots compare each occupation's average heart rate with its average stress level, and its average daily steps with its average sleep quality.
+"""
+
+CARDIO_CONCLUSION = """
+→ **Nurses** (89%) and **Teachers** (70%) have by far the most **stage 2 hypertension**, the same groups that report the most sleep apnea and insomnia.
+
+→ Most **Doctors, Engineers, Lawyers and Sales workers** fall in **stage 1**, while **Accountants** are the only group where most readings are **normal** (84%).
+
+→ **Heart rate rises with stress**: Sales workers (stress 7.1) average about 73 bpm, Engineers (stress 4.0) about 68 bpm.
+Respondent by respondent, the two are clearly correlated (Pearson r ≈ 0.67).
+
+→ **Daily steps say little about sleep quality**: Nurses walk the most (about 8,000 steps) but sleep only averagely,
+while Engineers sleep best with about 6,000 steps (respondent-level r ≈ 0.02).
+
+→ **What it demonstrates:**
+Cardiovascular risk follows the same occupational divide as sleep disorders, and stress, not physical activity, is the factor that tracks both heart rate and sleep quality.
+"""
+
+# study conclusion
+STUDY_TITLE = "Study Conclusion"
+STUDY_CONCLUSION = """
+This study examined the relationships between occupation, sleep disorders, BMI categories, and sleep quality/duration to understand health disparities **across professions**.
+
+##### Key insights:
+
+- Certain occupations, such as **sales workers, nurses, and teachers**, show significantly higher rates of sleep disorders (especially insomnia and sleep apnea) and elevated BMI levels, which highlights a concerning overlap between poor sleep health and weight issues.
+
+- In contrast, **doctors, engineers, accountants, and lawyers** tend to have lower prevalence of sleep disorders and healthier BMI levels. This may reflect not only greater health awareness, but also more stable work environments, structured routines, and access to resources that support healthier lifestyles. 
+
+- For example, while doctors report poorer sleep than expected, they still maintain relatively healthy BMI levels, likely due to the nature of their profession, which involves medical training and knowledge, and a culture that emphasizes preventive care and healthy habits.
+
+- Similarly, engineers and lawyers, despite mostly sedentary work, show better sleep and BMI profiles, suggesting that job structure plays a key role in shaping a healthy lifestyle.
+            
+While factors like age, gender, and physical activity do play a role, they do not fully account for the differences observed across occupations. This suggests that other elements, such as sleep or stress may have a stronger and more direct influence on health outcomes.
+
+Therefore, **sleep quality and duration emerge as strong predictors of BMI status across occupations**, as those with poorer sleep consistently show higher rates of overweight and obesity. These findings demonstrate the importance of considering workplace conditions when addressing public health issues related to weight and well-being.
+
+**Protective factors** such as medical knowledge and healthier habits appear to buffer some groups (e.g., doctors) against poor BMI outcomes despite less ideal sleep metrics.
+
+##### Implications:
+            
+Understanding how work influences and is interconnected to sleep and BMI results can help shape more effective workplace health initiatives. Occupation factors can affect sleep habits, stress levels and long-term weight outcomes. These results emphasize the need for employers to address work-related factors and that targeting occupation-specific challenges could lead to more successful measures. 
+            
+Future research should explore how specific occupational characteristics interact with sleep and lifestyle behaviors to influence overall health outcomes, as well as how improvements in sleep quality and general health can enhance workplace productivity and performance.
+
+"""
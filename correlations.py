@@ -0,0 +1,244 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from dataset import DATA_FILE, read_csv, read_csv_chunks
+
+# numeric fields correlated with each other; BMI enters as its ordinal category
+FIELDS = [
+    "Age",
+    "Sleep Duration",
+    "Quality of Sleep",
+    "Physical Activity Level",
+    "Stress Level",
+    "Heart Rate",
+    "Daily Steps",
+    "Systolic",
+    "Diastolic",
+    "BMI"
+]
+
+BMI_ORDER = {"Normal Weight": 0, "Overweight": 1, "Obese": 2}
+
+# pooled group used for the whole-dataset matrices
+ALL = "All occupations"
+
+
+# the fields as one float matrix, plus a mask of rows with every field present
+def field_matrix(df):
+    columns = {}
+    for field in FIELDS:
+        if field == "BMI":
+            # mapped once per category, not per row
+            columns[field] = df["BMI Category"].map(BMI_ORDER).astype("float64")
+        else:
+            columns[field] = df[field]
+    values = pd.DataFrame(columns).to_numpy(dtype="float64")
+    return values, ~np.isnan(values).any(axis=1)
+
+
+# per-group row counts, field sums and field x field sums of products: enough to
+# rebuild every covariance and correlation, and additive across chunks
+class CrossProducts:
+    def __init__(self, counts, sums, cross):
+        self.counts = counts    # rows per group
+        self.sums = sums        # group x field totals
+        self.cross = cross      # group x field x field sums of products (ndarray)
+
+    @property
+    def groups(self):
+        return self.counts.index
+
+    def merge(self, other):
+        groups = self.groups.union(other.groups, sort=False)
+        cross = np.zeros((len(groups), len(FIELDS), len(FIELDS)))
+        cross[groups.get_indexer(self.groups)] += self.cross
+        cross[groups.get_indexer(other.groups)] += other.cross
+        counts = self.counts.reindex(groups, fill_value=0) + other.counts.reindex(groups, fill_value=0)
+        sums = self.sums.reindex(groups, fill_value=0) + other.sums.reindex(groups, fill_value=0)
+        return CrossProducts(counts, sums, cross)
+
+    # only some groups (in the given order); groups without complete rows come out empty
+    def select(self, groups):
+        groups = pd.Index(groups, name=self.groups.name)
+        rows = self.groups.get_indexer(groups)
+        cross = np.where((rows >= 0)[:, None, None], self.cross[rows], 0)
+        return CrossProducts(
+            self.counts.reindex(groups, fill_value=0), self.sums.reindex(groups, fill_value=0), cross
+        )
+
+    # every group folded into one
+    def pooled(self, name=ALL):
+        groups = pd.Index([name], name=self.groups.name)
+        return CrossProducts(
+            pd.Series([self.counts.sum()], index=groups),
+            pd.DataFrame([self.sums.sum()], index=groups),
+            self.cross.sum(axis=0, keepdims=True)
+        )
+
+    # group x field x field Pearson coefficients (NaN where a field is constant)
+    def correlation(self):
+        n = self.counts.to_numpy(dtype="float64")[:, None, None]
+        sums = self.sums.to_numpy()
+        cov = self.cross - sums[:, :, None] * sums[:, None, :] / np.maximum(n, 1)
+        sd = np.sqrt(np.clip(np.diagonal(cov, axis1=1, axis2=2), 0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / (sd[:, :, None] * sd[:, None, :])
+        return np.where(n > 1, corr, np.nan)
+
+
+# rows are sorted by group once, then each group's field x field sums of products is
+# a single matrix product over its contiguous slice
+def cross_products(keys, values):
+    codes, groups = pd.factorize(keys)
+    groups = pd.Index(np.asarray(groups), name="Occupation")
+    n_groups, n_fields = len(groups), values.shape[1]
+
+    counts = np.bincount(codes, minlength=n_groups)
+    order = np.argsort(codes, kind="stable")
+    ends = np.cumsum(counts)
+    cross = np.zeros((n_groups, n_fields, n_fields))
+    for group, (start, end) in enumerate(zip(ends - counts, ends)):
+        rows = values[order[start:end]]
+        cross[group] = rows.T @ rows
+
+    sums = pd.DataFrame(
+        {field: np.bincount(codes, weights=values[:, i], minlength=n_groups) for i, field in enumerate(FIELDS)},
+        index=groups
+    )
+    return CrossProducts(pd.Series(counts, index=groups), sums, cross)
+
+
+# cross-products of the rows with every field and a group, e.g. to keep a running
+# Pearson matrix next to a summary
+def frame_cross_products(df, key="Occupation"):
+    values, complete = field_matrix(df)
+    complete &= df[key].notna().to_numpy()
+    return cross_products(df[key][complete], values[complete])
+
+
+# rows per (occupation, value) of every field, merged across chunks; turned into
+# mid-ranks once the whole file has been seen
+def value_counts(keys, values):
+    counts = {}
+    for i, field in enumerate(FIELDS):
+        pairs = pd.DataFrame({"Occupation": keys, "value": values[:, i]})
+        counts[field] = pairs.value_counts()
+    return counts
+
+
+def merge_value_counts(mine, theirs):
+    if mine is None:
+        return theirs
+    return {field: mine[field].add(theirs[field], fill_value=0) for field in FIELDS}
+
+
+# average rank of each value (ties share the mean of their positions), overall and
+# within each occupation
+def midranks(counts):
+    within = counts.sort_index()
+    within = within.groupby(level=0).cumsum() - (within - 1) / 2
+
+    overall = counts.groupby(level=1).sum().sort_index()
+    overall = overall.cumsum() - (overall - 1) / 2
+    return overall, within
+
+
+def rank_matrices(keys, values, ranks):
+    overall = np.empty_like(values)
+    within = np.empty_like(values)
+    for i, field in enumerate(FIELDS):
+        field_overall, field_within = ranks[field]
+        overall[:, i] = field_overall.reindex(values[:, i]).to_numpy()
+        within[:, i] = field_within.reindex(pd.MultiIndex.from_arrays([keys, values[:, i]])).to_numpy()
+    return overall, within
+
+
+# Pearson and Spearman matrices, pooled and per occupation; Spearman needs the ranks of
+# every row, so Correlations(pearson) from running cross-products has Pearson only
+class Correlations:
+    def __init__(self, pearson, spearman=None, spearman_pooled=None):
+        self.pearson = pearson
+        self.spearman = spearman
+        self.spearman_pooled = spearman_pooled
+
+    @property
+    def occupations(self):
+        return self.pearson.groups
+
+    def counts(self):
+        return self.pearson.counts
+
+    # field x field matrix for one occupation, or every respondent when occupation is None
+    def matrix(self, method="pearson", occupation=None):
+        if method == "pearson":
+            stats = self.pearson.pooled() if occupation is None else self.pearson
+        elif method == "spearman":
+            if self.spearman is None:
+                raise ValueError("Spearman needs a pass over every row (correlate)")
+            stats = self.spearman_pooled if occupation is None else self.spearman
+        else:
+            raise ValueError(f"unknown correlation method: {method}")
+        row = 0 if occupation is None else stats.groups.get_loc(occupation)
+        return pd.DataFrame(stats.correlation()[row], index=FIELDS, columns=FIELDS)
+
+
+# two streaming passes over `chunks()` (a callable returning a fresh iterator of
+# cleaned frames): the first sums the raw cross-products and counts every value,
+# the second sums the cross-products of mid-ranks for Spearman
+def correlate(chunks, key="Occupation"):
+    pearson = None
+    counts = None
+    for chunk in chunks():
+        values, complete = field_matrix(chunk)
+        keys = np.asarray(chunk[key], dtype=object)[complete]
+        values = values[complete]
+        partial = cross_products(keys, values)
+        pearson = partial if pearson is None else pearson.merge(partial)
+        counts = merge_value_counts(counts, value_counts(keys, values))
+    if pearson is None:
+        raise ValueError("no rows to correlate")
+
+    ranks = {field: midranks(field_counts) for field, field_counts in counts.items()}
+    spearman = None
+    spearman_pooled = None
+    for chunk in chunks():
+        values, complete = field_matrix(chunk)
+        keys = np.asarray(chunk[key], dtype=object)[complete]
+        overall, within = rank_matrices(keys, values[complete], ranks)
+        partial = cross_products(keys, within)
+        spearman = partial if spearman is None else spearman.merge(partial)
+        partial = cross_products(np.full(len(keys), ALL, dtype=object), overall)
+        spearman_pooled = partial if spearman_pooled is None else spearman_pooled.merge(partial)
+
+    return Correlations(pearson, spearman, spearman_pooled)
+
+
+def correlate_frame(df):
+    return correlate(lambda: [df])
+
+
+# correlations of one survey csv, optionally streamed in chunks (read twice)
+def correlate_file(path, chunksize=None):
+    if chunksize:
+        return correlate(lambda: read_csv_chunks(path, chunksize))
+    df = read_csv(path)
+    return correlate_frame(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pearson / Spearman correlations between the numeric survey fields")
+    parser.add_argument("csv", nargs="?", default=DATA_FILE, help="survey csv to analyze")
+    parser.add_argument("--chunksize", type=int, help="stream the csv in chunks of this many rows")
+    parser.add_argument("--method", choices=["pearson", "spearman"], default="pearson")
+    parser.add_argument("--occupation", help="one occupation instead of every respondent")
+    args = parser.parse_args()
+
+    result = correlate_file(args.csv, args.chunksize)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(result.matrix(args.method, args.occupation).round(2))
+
+
+if __name__ == "__main__":
+    main()
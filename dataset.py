@@ -0,0 +1,303 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # no columnar cache without pyarrow, always parse the csv
+    feather = None
+
+DATA_FILE = "Sleep_health_and_lifestyle_dataset.csv"
+
+# explicit dtypes for the survey columns, small ints for ages and scores
+SCHEMA = {
+    "Person ID": "int32",
+    "Age": "int8",
+    "Sleep Duration": "float32",
+    "Quality of Sleep": "int8",
+    "Physical Activity Level": "int8",
+    "Stress Level": "int8",
+    "Heart Rate": "int16",
+    "Daily Steps": "int32",
+    # text is read as plain strings (no per-chunk type guessing) and categorized after cleaning
+    "Gender": "object",
+    "Occupation": "object",
+    "BMI Category": "object",
+    "Blood Pressure": "object",
+    "Sleep Disorder": "object"
+}
+
+# low-cardinality text columns stored as categoricals once cleaned
+CATEGORY_COLUMNS = ["Gender", "Occupation", "BMI Category", "Sleep Disorder"]
+
+# per-column label rules (synonyms to merge, missing value fill, whitespace stripping);
+# HEALTH_RULES points at a site-specific copy
+RULES_FILE = os.environ.get(
+    "HEALTH_RULES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cleaning_rules.json")
+)
+
+# bump when the cleaning or schema changes so existing caches are rebuilt
+CACHE_VERSION = 5
+
+# ACC/AHA blood pressure stages from least to most severe, with the systolic and
+# diastolic readings each one starts at (either reading is enough)
+BP_STAGES = ["Normal", "Elevated", "Stage 1", "Stage 2"]
+BP_THRESHOLDS = {"Elevated": (120, None), "Stage 1": (130, 80), "Stage 2": (140, 90)}
+
+
+def load_rules(path=RULES_FILE):
+    with open(path) as f:
+        return json.load(f)
+
+
+RULES = load_rules()
+
+# identifies the rules a cached frame was cleaned with
+RULES_DIGEST = hashlib.sha256(json.dumps(RULES, sort_keys=True).encode()).hexdigest()
+
+
+# one distinct label through its column's rule: fill, strip, then rename
+def clean_label(label, rule):
+    if label is None or label != label:
+        label = rule.get("missing", label)
+    if isinstance(label, str) and rule.get("strip"):
+        label = label.strip()
+    return rule.get("rename", {}).get(label, label)
+
+
+# apply a rule to the column's category dictionary: every distinct label is cleaned
+# once and the integer codes are rewritten in bulk, whatever the number of rows
+def apply_rule(values, rule):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, labels = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, labels = pd.factorize(values)
+
+    cleaned = [clean_label(label, rule) for label in labels]
+    if "missing" in rule:
+        # missing rows get their own slot so the fill label goes through the same rule
+        cleaned.append(clean_label(None, rule))
+        codes = np.where(codes < 0, len(labels), codes)
+
+    categories = pd.Index(sorted({label for label in cleaned if isinstance(label, str)}))
+    lookup = np.append(categories.get_indexer(cleaned), -1)  # -1 keeps missing rows missing
+    return pd.Categorical.from_codes(lookup[codes], categories)
+
+
+# same cleaning the dashboard and the analysis script always applied, driven by the rules file
+def clean(df, rules=None):
+    for column, rule in (rules or RULES).items():
+        if column in df.columns:
+            df[column] = apply_rule(df[column], rule)
+    return df
+
+
+# BP_STAGES position of each reading: the most severe stage whose threshold it reaches
+def bp_stage(systolic, diastolic):
+    conditions = []
+    choices = []
+    for stage in reversed(BP_STAGES[1:]):
+        systolic_from, diastolic_from = BP_THRESHOLDS[stage]
+        reached = systolic >= systolic_from
+        if diastolic_from is not None:
+            reached |= diastolic >= diastolic_from
+        conditions.append(reached)
+        choices.append(BP_STAGES.index(stage))
+    return np.select(conditions, choices, default=0).astype("int8")
+
+
+# split "126/83" into numeric systolic and diastolic columns plus their BP Stage (each
+# distinct reading is parsed and staged once, then spread to the rows through its code);
+# a missing reading, or one that is not two whole numbers around a "/" ("120", "abc/80"),
+# leaves both numbers NaN (float32 instead of int16) and the stage missing, so it is
+# left out of the stage percentages, as the duckdb backend does
+def parse_blood_pressure(df):
+    if "Blood Pressure" not in df.columns:
+        return df
+    codes, readings = pd.factorize(df["Blood Pressure"])
+    missing = codes < 0
+    pressure = pd.Series(readings, dtype=object).str.split("/", expand=True).reindex(columns=[0, 1, 2])
+    systolic = pd.to_numeric(pressure[0], errors="coerce").to_numpy(dtype="float64", copy=True)
+    diastolic = pd.to_numeric(pressure[1], errors="coerce").to_numpy(dtype="float64", copy=True)
+    valid = pressure[2].isna().to_numpy(copy=True)
+    for values in (systolic, diastolic):
+        valid &= np.isfinite(values) & (values == np.floor(values))
+    stages = np.where(valid, bp_stage(systolic, diastolic), -1)
+    systolic[~valid] = np.nan
+    diastolic[~valid] = np.nan
+    if missing.any():
+        # one extra slot at the end for the rows without a reading
+        codes = np.where(missing, len(readings), codes)
+        systolic = np.append(systolic, np.nan)
+        diastolic = np.append(diastolic, np.nan)
+        stages = np.append(stages, -1)
+    dtype = "int16" if valid.all() and not missing.any() else "float32"
+    position = df.columns.get_loc("Blood Pressure")
+    df = df.drop(columns="Blood Pressure")
+    df.insert(position, "Systolic", systolic.astype(dtype)[codes])
+    df.insert(position + 1, "Diastolic", diastolic.astype(dtype)[codes])
+    df.insert(position + 2, "BP Stage", pd.Categorical.from_codes(stages[codes], BP_STAGES))
+    return df
+
+
+# convert cleaned text columns to categoricals
+def compact(df):
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("category")
+    return df
+
+
+# typed, cleaned frame from any csv with the survey layout
+def prepare(df):
+    return compact(parse_blood_pressure(clean(df)))
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# columnar copy and its metadata live next to the csv
+def cache_paths(path):
+    stem = os.path.splitext(path)[0]
+    return stem + ".arrow", stem + ".arrow.json"
+
+
+def read_cache_meta(path):
+    meta_path = cache_paths(path)[1]
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# the cache is valid while the csv keeps the same size and mtime; if only the
+# mtime moved, the content hash decides (and the new mtime is recorded)
+def cache_is_fresh(path, meta):
+    if meta is None or meta.get("version") != CACHE_VERSION or meta.get("rules") != RULES_DIGEST:
+        return False
+    stat = os.stat(path)
+    if meta["size"] != stat.st_size:
+        return False
+    if meta["mtime_ns"] == stat.st_mtime_ns:
+        return True
+    if meta["sha256"] != file_sha256(path):
+        return False
+    meta["mtime_ns"] = stat.st_mtime_ns
+    try:
+        write_cache_meta(path, meta)
+    except OSError:
+        pass
+    return True
+
+
+def write_cache_meta(path, meta):
+    meta_path = cache_paths(path)[1]
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+
+
+# size and mtime of a file: one stat, and it changes with every append or rewrite (the
+# same signals cache_is_fresh trusts), so it keys per-request caches without hashing
+def file_stamp(path=DATA_FILE):
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+# content hash of the source the cached frame was built from
+def dataset_version(path=DATA_FILE):
+    meta = read_cache_meta(path)
+    if cache_is_fresh(path, meta):
+        return meta["sha256"]
+    return file_sha256(path)
+
+
+# size, mtime and hash of the csv, taken before it is parsed: rows appended while the
+# parse runs then make the next check see a larger file and rebuild, instead of the
+# cache being recorded as fresh without them
+def cache_meta(path):
+    stat = os.stat(path)
+    return {
+        "version": CACHE_VERSION,
+        "rules": RULES_DIGEST,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_sha256(path)
+    }
+
+
+def write_cache(path, df, meta):
+    arrow_path = cache_paths(path)[0]
+    # uncompressed and in one record batch so later loads can memory-map each column
+    # without stitching chunks together; written beside it and swapped in, so workers
+    # that still map the old copy never see a half-written file
+    tmp_path = f"{arrow_path}.{os.getpid()}.tmp"
+    try:
+        feather.write_feather(df, tmp_path, compression="uncompressed", chunksize=max(len(df), 1))
+        os.replace(tmp_path, arrow_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    write_cache_meta(path, meta)
+
+
+# read-only frame over the memory-mapped cache: one block per column keeps the numeric
+# columns as views on the file, so every worker process serving the same csv shares a
+# single copy in the OS page cache instead of holding its own
+def read_cache(path):
+    table = feather.read_table(cache_paths(path)[0], memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def read_csv(path):
+    return prepare(pd.read_csv(path, dtype=SCHEMA))
+
+
+# stream the csv as cleaned, typed chunks so files larger than memory can be aggregated
+def read_csv_chunks(path, chunksize=100_000):
+    for chunk in pd.read_csv(path, dtype=SCHEMA, chunksize=chunksize):
+        yield prepare(chunk)
+
+
+# load the dataset with the explicit schema, optionally reporting the memory saved;
+# a cleaned Arrow IPC copy is reused until the csv changes, and served memory-mapped
+# (treat the frame as read-only)
+def load_dataset(path=DATA_FILE, report=False, cache=True):
+    if cache and feather is not None:
+        arrow_path = cache_paths(path)[0]
+        if os.path.exists(arrow_path) and cache_is_fresh(path, read_cache_meta(path)):
+            df = read_cache(path)
+        else:
+            meta = cache_meta(path)
+            df = read_csv(path)
+            try:
+                write_cache(path, df, meta)
+                df = read_cache(path)  # drop the private copy for the shared mapping
+            except OSError:
+                pass  # read-only deployment, keep serving from the csv
+    else:
+        df = read_csv(path)
+
+    if report:
+        before = memory_mb(pd.read_csv(path))
+        after = memory_mb(df)
+        print(f"memory: {before:.2f} MB untyped -> {after:.2f} MB typed ({before / after:.1f}x smaller)")
+
+    return df
+
+
+if __name__ == "__main__":
+    df = load_dataset(report=True)
+    print(df.dtypes)
@@ -0,0 +1,40 @@
+import threading
+from collections import OrderedDict
+
+from charts import figure_bytes
+
+
+# size-bounded LRU of rendered figure bytes, shared by every session of the app
+class FigureCache:
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    # key is (chart id, selections..., data version); draw builds the figure on a miss
+    def render(self, key, draw, fmt="png"):
+        key = key + (fmt,)
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+
+        # render outside the lock so one slow figure doesn't block other sessions
+        data = figure_bytes(draw(), fmt)
+
+        with self._lock:
+            self._items[key] = data
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return data
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self), "maxsize": self.maxsize}
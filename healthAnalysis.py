@@ -1,107 +1,126 @@
-import pandas as pd
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import matplotlib.pyplot as plt
 import numpy as np
 
-# load the dataset
-df = pd.read_csv("Sleep_health_and_lifestyle_dataset.csv")
+from aggregates import BACKEND, BACKENDS, summarize, summarize_chunks, summarize_file
+from bootstrap import BootstrapRates
+from dataset import BP_STAGES, DATA_FILE, load_dataset, read_csv_chunks
 
 # Step 1
-# clean and prepare the data
+# load, clean and prepare the data
+def load_summary(csv=DATA_FILE, chunksize=None, backend=BACKEND):
+    # typed loader: groups similar roles, replaces inconsistent BMI labels,
+    # fills missing Sleep Disorder values and parses blood pressure.
+    # every per-occupation mean, count and category breakdown comes from a single pass,
+    # either over the whole frame or folded chunk by chunk for files larger than memory
+    # (or as one SQL query over the file with the duckdb backend)
+    if backend != "pandas":
+        summary = summarize_file(csv, backend=backend)
+    elif chunksize:
+        summary = summarize_chunks(read_csv_chunks(csv, chunksize))
+    else:
+        df = load_dataset(csv)
+        summary = summarize(df)
 
-# check for missing values in each column
-# print(df.isnull().sum())
+    # check for missing values in each column
+    # print(df.isnull().sum())
 
-# group similar roles into broader categories
-occupation_mapping = {
-    "Sales Representative": "Sales",
-    "Salesperson": "Sales",
-    "Software Engineer": "Engineer"
-}
-df["Occupation"] = df["Occupation"].replace(occupation_mapping)
+    # check new distribution of occupations
+    # print(summary.counts)
 
-# replace inconsistent BMI labels
-bmi_mapping = {
-    "Normal": "Normal Weight"
-}
-df["BMI Category"] = df["BMI Category"].replace(bmi_mapping)
+    # filter and analyze sleep disorder data
 
-# check new distribution of occupations
-# print(df["Occupation"].value_counts())
+    # only analyze occupations with a reasonable sample size (5 or more people)
+    # (sorted alphabetically like a groupby on Occupation)
+    valid_jobs = summary.eligible(5)
+    return summary.select(sorted(valid_jobs))
 
-# filter and analyze sleep disorder data
 
-# only analyze occupations with a reasonable sample size (5 or more people)
-counts = df["Occupation"].value_counts()
-valid_jobs = counts[counts >= 5].index
-filtered_df = df[df["Occupation"].isin(valid_jobs)].copy()
+# 95% bootstrap interval of the combined share of `categories` in each occupation,
+# as (below, above) distances for matplotlib error bars; `rates` is the column's
+# BootstrapRates, built once and shared by every category drawn from it
+def share_errors(summary, rates, categories, pct):
+    bounds = rates.interval(summary.occupations.tolist(), categories)
+    return [(pct - bounds["low"]).clip(lower=0), (bounds["high"] - pct).clip(lower=0)]
 
-# fill missing values in Sleep Disorder with No Disorder and remove any whitespace
-filtered_df.loc[:, "Sleep Disorder"] = filtered_df["Sleep Disorder"].fillna("No Disorder").str.strip()
 
 # Step 2: Analysis
 # QUESTION 1: Which occupations report the highest percentage of sleep disorders?
+def sleep_disorders_chart(summary):
+    # how many people per disorder type in each occupation
+    disorder_counts = summary.category_counts("Sleep Disorder").copy()
+
+    # add total individuals per occupation
+    disorder_counts["Total"] = disorder_counts.sum(axis=1)
+
+    # calculate percentages of each disorder type
+    disorder_percent = disorder_counts.div(disorder_counts["Total"], axis=0) * 100
 
-# Group by Occupation and Sleep Disorder to count how many people per disorder type
-disorder_counts = filtered_df.groupby(["Occupation", "Sleep Disorder"]).size().unstack(fill_value=0) # turns the Series into a DataFrame
+    # format output as percentage strings
+    formatted_percent = disorder_percent[["Insomnia", "Sleep Apnea", "No Disorder"]].round(1).astype(str) + "%"
+    formatted_percent["Total"] = disorder_counts["Total"]
 
-# add total individuals per occupation
-disorder_counts["Total"] = disorder_counts.sum(axis=1)
+    # display sleep disorder distribution
+    # print("\n=== Sleep Disorders by Occupation ===")
+    # print(formatted_percent)
 
-# calculate percentages of each disorder type
-disorder_percent = disorder_counts.div(disorder_counts["Total"], axis=0) * 100
 
-# format output as percentage strings
-formatted_percent = disorder_percent[["Insomnia", "Sleep Apnea", "No Disorder"]].round(1).astype(str) + "%"
-formatted_percent["Total"] = disorder_counts["Total"]
+    #  clustered bar chart for better vizualisation 
+    fig = plt.figure(figsize=(10, 6))
+    occupation_names = summary.occupations.tolist()
+    # print(occupation_names)
 
-# display sleep disorder distribution
-# print("\n=== Sleep Disorders by Occupation ===")
-# print(formatted_percent)
+    # define the x-axis group labels
+    labels = occupation_names
 
+    # get the percentage values for each type
+    insomnia = disorder_percent["Insomnia"].tolist()
+    sleep_apnea = disorder_percent["Sleep Apnea"].tolist()
+    no_disorder = disorder_percent["No Disorder"].tolist()
 
-#  clustered bar chart for better vizualisation 
-plt.figure(figsize=(10, 6))
-occupation_names = filtered_df.groupby("Occupation").size().index.tolist()
-# print(occupation_names)
+    # set up positions for the bars
+    x = np.arange(len(labels))
+    width = 0.25  # width of each bar
 
-# define the x-axis group labels
-labels = occupation_names
+    # bootstrap error bars: some occupations only just pass the 5 respondent threshold
+    rates = BootstrapRates(summary.category_counts("Sleep Disorder"))
+    errors = {
+        disorder: share_errors(summary, rates, [disorder], disorder_percent[disorder])
+        for disorder in ["Insomnia", "Sleep Apnea", "No Disorder"]
+    }
 
-# get the percentage values for each type
-insomnia = disorder_percent["Insomnia"].tolist()
-sleep_apnea = disorder_percent["Sleep Apnea"].tolist()
-no_disorder = disorder_percent["No Disorder"].tolist()
+    # plot each category with an offset
+    plt.bar(x - width, insomnia, width, label="Insomnia", yerr=errors["Insomnia"], capsize=2)
+    plt.bar(x, sleep_apnea, width, label="Sleep Apnea", yerr=errors["Sleep Apnea"], capsize=2)
+    plt.bar(x + width, no_disorder, width, label="No Disorder", yerr=errors["No Disorder"], capsize=2)
 
-# set up positions for the bars
-x = np.arange(len(labels))
-width = 0.25  # width of each bar
+    # customize chart
+    plt.title("Sleep Disorders by Occupation (%)")
+    plt.ylabel("Percentage")
+    plt.xticks(x, labels, rotation=45)  # add labels
+    plt.ylim(0, 100)  # percent scale
+    plt.legend()
 
-# plot each category with an offset
-plt.bar(x - width, insomnia, width, label="Insomnia")
-plt.bar(x, sleep_apnea, width, label="Sleep Apnea")
-plt.bar(x + width, no_disorder, width, label="No Disorder")
+    # add value labels on top of bars
+    offset = 0.5  # small relative offset above each bar
 
-# customize chart
-plt.title("Sleep Disorders by Occupation (%)")
-plt.ylabel("Percentage")
-plt.xticks(x, labels, rotation=45)  # add labels
-plt.ylim(0, 100)  # percent scale
-plt.legend()
+    # (above the error bar, so the two do not overlap)
+    above = {disorder: error[1].tolist() for disorder, error in errors.items()}
 
-# add value labels on top of bars
-offset = 0.5  # small relative offset above each bar
+    for i in range(len(labels)):
+        plt.text(x[i] - width, insomnia[i] + above["Insomnia"][i] + offset, f"{insomnia[i]:.1f}%", ha="center", va="bottom", fontsize=8)
+        plt.text(x[i], sleep_apnea[i] + above["Sleep Apnea"][i] + offset, f"{sleep_apnea[i]:.1f}%", ha="center", va="bottom", fontsize=8)
+        plt.text(x[i] + width, no_disorder[i] + above["No Disorder"][i] + offset, f"{no_disorder[i]:.1f}%", ha="center", va="bottom", fontsize=8)
 
-for i in range(len(labels)):
-    plt.text(x[i] - width, insomnia[i] + offset, f"{insomnia[i]:.1f}%", ha="center", va="bottom", fontsize=8)
-    plt.text(x[i], sleep_apnea[i] + offset, f"{sleep_apnea[i]:.1f}%", ha="center", va="bottom", fontsize=8)
-    plt.text(x[i] + width, no_disorder[i] + offset, f"{no_disorder[i]:.1f}%", ha="center", va="bottom", fontsize=8)
 
+    #  prevent labels to be cutoff
+    plt.tight_layout()
+    return fig
 
-#  prevent labels to be cutoff
-plt.tight_layout()
-# display the chart
-plt.show()
-plt.close()
 
 # Conclusion:
 # Sales workers are the most affected by sleep disorders, with 85.3% reporting insomnia, 8.8% reporting sleep apnea, and only 5.9% reporting no disorder.
@@ -109,104 +128,96 @@ plt.close()
 # Teachers also show high insomnia levels (67.5%) and only 22.5% with no disorder.
 # In contrast, Doctors, Engineers, Accountans, and Lawyers have the lowest disorder rates. Over 80% of individuals in each of those professions report no sleep disorder.
 
+
 # -------
 # QUESTION 2: Do occupations with higher stress levels also report lower sleep quality or fewer sleep hours?
+def stress_sleep_chart(summary):
+    means = summary.means
+    labels = summary.occupations.tolist()
+
+    # average stress level
+    occupation_stress_levels = (
+        means["Stress Level"].sort_values(ascending=False)
+        .round(1).astype(str) + " stress level"
+    )
+
+    # average sleep duration
+    occupation_sleep_hours = (
+        means["Sleep Duration"].sort_values(ascending=True)
+        .round(1).astype(str) + " hours of sleep"
+    )
+
+    # average sleep quality
+    occupation_sleep_quality = (
+        means["Quality of Sleep"].sort_values(ascending=True)
+        .round(1)
+    )
+
+    # average physical activity level
+    occupation_physical_activity = (
+        means["Physical Activity Level"].sort_values(ascending=True)
+        .round(1)
+    )
+
+    # display results
+    # print("\n=== Average Stress Levels ===")
+    # print(occupation_stress_levels)
+
+    # print("\n=== Average Sleep Duration ===")
+    # print(occupation_sleep_hours)
+
+    # print("\n=== Average Sleep Quality ===")
+    # print(occupation_sleep_quality)
+
+    # print("\n=== Average Physical Activity Level ===")
+    # print(occupation_physical_activity)
+
+
+    # clustered bar chart with two Y-axes
+    # get the values for each bar
+    stress_levels_list = means["Stress Level"].round(1).tolist()
+
+    sleep_hours_list = means["Sleep Duration"].round(1).to_list()
+
+    sleep_quality_list = means["Quality of Sleep"].round(1).tolist()
+
+    phy_activity_list = means["Physical Activity Level"].round(1).tolist()
+
+
+    # creates a new figure
+    fig, ax1 = plt.subplots(figsize=(9, 6))
+
+    # set up positions and width based on the same occupation data we gathered before
+    x = np.arange(len(labels))
+    width = 0.25
+
+    # plot on primary y axis
+    ax1.bar(x - width, stress_levels_list, width, label="Stress Level")
+    ax1.bar(x, sleep_hours_list, width, label="Sleep Duration")
+    ax1.bar(x + width, sleep_quality_list, width, label="Sleep Quality")
+
+    # customize primary y axis
+    ax1.set_ylabel("Scale (0–10)")
+    ax1.set_ylim(0, 10)
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(labels, rotation=45)
+    ax1.set_title("Stress, Sleep, and Physical Activity by Occupation")
+
+    # secondary y axis for physical activity
+    ax2 = ax1.twinx()
+    ax2.set_ylabel("Physical Activity Level (0-100)")
+    ax2.plot(x, phy_activity_list, label="Physical Activity", color="tab:red", marker="o", linewidth=2)
+    ax2.set_ylim(0, 100)
+
+    # combine legends from both axes
+    lines_1, labels_1 = ax1.get_legend_handles_labels()
+    lines_2, labels_2 = ax2.get_legend_handles_labels()
+    ax1.legend(lines_1 + lines_2, labels_1 + labels_2,)
+
+    # displaye the chart
+    plt.tight_layout()
+    return fig
 
-# average stress level
-occupation_stress_levels = (
-    filtered_df.groupby("Occupation")["Stress Level"]
-    .mean().sort_values(ascending=False)
-    .round(1).astype(str) + " stress level"
-)
-
-# average sleep duration
-occupation_sleep_hours = (
-    filtered_df.groupby("Occupation")["Sleep Duration"]
-    .mean().sort_values(ascending=True)
-    .round(1).astype(str) + " hours of sleep"
-)
-
-# average sleep quality
-occupation_sleep_quality = (
-    filtered_df.groupby("Occupation")["Quality of Sleep"]
-    .mean().sort_values(ascending=True)
-    .round(1)
-)
-
-# average physical activity level
-occupation_physical_activity = (
-    filtered_df.groupby("Occupation")["Physical Activity Level"]
-    .mean().sort_values(ascending=True)
-    .round(1)
-)
-
-# display results
-# print("\n=== Average Stress Levels ===")
-# print(occupation_stress_levels)
-
-# print("\n=== Average Sleep Duration ===")
-# print(occupation_sleep_hours)
-
-# print("\n=== Average Sleep Quality ===")
-# print(occupation_sleep_quality)
-
-# print("\n=== Average Physical Activity Level ===")
-# print(occupation_physical_activity)
-
-
-# clustered bar chart with two Y-axes
-# get the values for each bar
-stress_levels_list = (
-    filtered_df.groupby("Occupation")["Stress Level"].mean().round(1).tolist()
-)
-
-sleep_hours_list = (
-    filtered_df.groupby("Occupation")["Sleep Duration"].mean().round(1).to_list()
-)
-
-sleep_quality_list = (
-    filtered_df.groupby("Occupation")["Quality of Sleep"].mean().round(1).tolist()
-)
-
-phy_activity_list = (
-    filtered_df.groupby("Occupation")["Physical Activity Level"].mean().round(1).tolist()
-)
-
-
-# creates a new figure
-fig, ax1 = plt.subplots(figsize=(9, 6))
-
-# set up positions and width based on the same occupation data we gathered before
-x = np.arange(len(labels))
-width = 0.25
-
-# plot on primary y axis
-ax1.bar(x - width, stress_levels_list, width, label="Stress Level")
-ax1.bar(x, sleep_hours_list, width, label="Sleep Duration")
-ax1.bar(x + width, sleep_quality_list, width, label="Sleep Quality")
-
-# customize primary y axis
-ax1.set_ylabel("Scale (0–10)")
-ax1.set_ylim(0, 10)
-ax1.set_xticks(x)
-ax1.set_xticklabels(labels, rotation=45)
-ax1.set_title("Stress, Sleep, and Physical Activity by Occupation")
-
-# secondary y axis for physical activity
-ax2 = ax1.twinx()
-ax2.set_ylabel("Physical Activity Level (0-100)")
-ax2.plot(x, phy_activity_list, label="Physical Activity", color="tab:red", marker="o", linewidth=2)
-ax2.set_ylim(0, 100)
-
-# combine legends from both axes
-lines_1, labels_1 = ax1.get_legend_handles_labels()
-lines_2, labels_2 = ax2.get_legend_handles_labels()
-ax1.legend(lines_1 + lines_2, labels_1 + labels_2,)
-
-# displaye the chart
-plt.tight_layout()
-plt.show()
-plt.close()
 
 # Conclusion:
 # There’s a clear correlation between higher stress and poorer sleep health.
@@ -215,88 +226,93 @@ plt.close()
 # Engineers, on the other hand, report the lowest stress (4.0), highest sleep duration (7.9 hours), and best sleep quality (8.3).
 # Interestingly, physical activity levels appear to vary independently as nurses (78.6) and lawyers (70.4) report the highest activity, while engineers (51.6) and sales workers (44.1) are less active. Despite lower activity, engineers report excellent sleep, which may mean stress has a stronger influence on sleep health than physical activity alone.
 
+
 # -------
 # QUESTION 3: Are there noticeable differences in BMI category distribution across occupations?
 # This analysis shows whether specific jobs are linked with higher rates of overweight or obesity.
+def bmi_age_chart(summary):
+    means = summary.means
 
-# count BMI categories by occupation
-bmi_counts = filtered_df.groupby(["Occupation", "BMI Category"]).size().unstack(fill_value=0)
-bmi_counts["Total"] = bmi_counts.sum(axis=1)
+    # count BMI categories by occupation
+    bmi_counts = summary.category_counts("BMI Category").copy()
+    bmi_counts["Total"] = bmi_counts.sum(axis=1)
 
-# calculate percentage of BMI categories per occupation
-bmi_percent = bmi_counts.div(bmi_counts["Total"], axis=0) * 100
+    # calculate percentage of BMI categories per occupation
+    bmi_percent = bmi_counts.div(bmi_counts["Total"], axis=0) * 100
 
-# format BMI percentages
-formatted_percent_bmi = bmi_percent[["Overweight", "Obese", "Normal Weight"]].round(1).astype(str) + "%"
-formatted_percent_bmi["Total"] = bmi_counts["Total"]
+    # format BMI percentages
+    formatted_percent_bmi = bmi_percent[["Overweight", "Obese", "Normal Weight"]].round(1).astype(str) + "%"
+    formatted_percent_bmi["Total"] = bmi_counts["Total"]
 
-# avg age by occupation
-age_by_occupation = filtered_df.groupby("Occupation")["Age"].mean().round(1).sort_values(ascending=True)
+    # avg age by occupation
+    age_by_occupation = means["Age"].round(1).sort_values(ascending=True)
 
 
-# gender percent per occupation
-gender_counts = filtered_df.groupby(["Occupation", "Gender"]).size().unstack(fill_value=0)
-gender_counts["Total"] = gender_counts.sum(axis=1)
-gender_percent = gender_counts.div(gender_counts["Total"], axis=0 ) *100
-gender_formatted = gender_percent[["Male", "Female"]].round(1).astype(str) + "%"
+    # gender percent per occupation
+    gender_counts = summary.category_counts("Gender").copy()
+    gender_counts["Total"] = gender_counts.sum(axis=1)
+    gender_percent = gender_counts.div(gender_counts["Total"], axis=0 ) *100
+    gender_formatted = gender_percent[["Male", "Female"]].round(1).astype(str) + "%"
 
 
-# display results
-# print("\n=== BMI Categories by Occupation ===")
-# print(formatted_percent_bmi)
-# print("\n=== Average Age by Occupation ===")
-# print(age_by_occupation)
-# print("\n=== Gender by Occupation ===")
-# print(gender_formatted)
+    # display results
+    # print("\n=== BMI Categories by Occupation ===")
+    # print(formatted_percent_bmi)
+    # print("\n=== Average Age by Occupation ===")
+    # print(age_by_occupation)
+    # print("\n=== Gender by Occupation ===")
+    # print(gender_formatted)
 
 
-# BMI bar chart
-fig, ax1 = plt.subplots(figsize=(9, 6))
+    # BMI bar chart
+    fig, ax1 = plt.subplots(figsize=(9, 6))
 
-# set primary y axis for BMI data
-ax1.set_xlabel("Occupation")
-ax1.set_ylabel("% Overweight + Obese")
+    # set primary y axis for BMI data
+    ax1.set_xlabel("Occupation")
+    ax1.set_ylabel("% Overweight + Obese")
 
-# calculate combined BMI percentage
-bmi_combined = bmi_percent["Overweight"] + bmi_percent["Obese"]
+    # calculate combined BMI percentage
+    bmi_combined = bmi_percent["Overweight"] + bmi_percent["Obese"]
 
-# plot BMI as a blue bar chart
-bars = bmi_combined.plot(kind="bar", ax=ax1)
-ax1.tick_params(axis="y")
+    # plot BMI as a blue bar chart with bootstrap error bars
+    rates = BootstrapRates(summary.category_counts("BMI Category"))
+    errors = share_errors(summary, rates, ["Overweight", "Obese"], bmi_combined)
+    bars = bmi_combined.plot(kind="bar", ax=ax1, yerr=np.array(errors), capsize=3)
+    ax1.tick_params(axis="y")
 
-# Rotate x-axis labels 45 degrees
-ax1.set_xticklabels(bmi_combined.index, rotation=45, ha='right') 
+    # Rotate x-axis labels 45 degrees
+    ax1.set_xticklabels(bmi_combined.index, rotation=45, ha='right') 
 
-# adds the dominant gender for that occupation
-for i, occupation in enumerate(bmi_combined.index):
-    percent_male = gender_percent.loc[occupation, "Male"]
-    percent_female = gender_percent.loc[occupation, "Female"]
+    # adds the dominant gender for that occupation
+    for i, occupation in enumerate(bmi_combined.index):
+        percent_male = gender_percent.loc[occupation, "Male"]
+        percent_female = gender_percent.loc[occupation, "Female"]
 
-    # create label showing dominant gender and its percentage
-    if percent_male > percent_female:
-        label = f"{percent_male:.0f}% M"
-    else:
-        label = f"{percent_female:.0f}% F"
+        # create label showing dominant gender and its percentage
+        if percent_male > percent_female:
+            label = f"{percent_male:.0f}% M"
+        else:
+            label = f"{percent_female:.0f}% F"
 
-    # place the label above each bar
-    ax1.text(i, bmi_combined[occupation] + 1, label, ha="center", va="bottom")
+        # place the label above each bar
+        ax1.text(i, bmi_combined[occupation] + errors[1][occupation] + 1, label, ha="center", va="bottom")
 
-# create a secondary y axis for average age
-ax2 = ax1.twinx()
+    # create a secondary y axis for average age
+    ax2 = ax1.twinx()
 
-# plot average age as a red line
-color = "tab:red"
-age_by_occupation[bmi_combined.index].plot(
-    ax=ax2, color=color, marker="o", linewidth=2
-)
+    # plot average age as a red line
+    color = "tab:red"
+    age_by_occupation[bmi_combined.index].plot(
+        ax=ax2, color=color, marker="o", linewidth=2
+    )
 
-# set properties for the secondary y-axis
-ax2.set_ylabel("Average Age", color=color)
-ax2.tick_params(axis="y", labelcolor=color)
+    # set properties for the secondary y-axis
+    ax2.set_ylabel("Average Age", color=color)
+    ax2.tick_params(axis="y", labelcolor=color)
 
-plt.title("BMI Rate vs. Age by Occupation (with Dominant Gender %)")
-plt.tight_layout()
-plt.show()
+    plt.title("BMI Rate vs. Age by Occupation (with Dominant Gender %)")
+    plt.tight_layout()
+    return fig
 
 
 # Conclusion:
@@ -314,41 +330,47 @@ plt.show()
 # Occupations with the highest overweight/obesity rates tend to be female-dominated (e.g. nurses, teachers).
 # However, sales, a male-dominated field, also has extremely poor BMI results, which suggest that gender is also not enough to explain that alone the differences in BMI across occupations.
 
+
 # ----
 
 # Extended conclusion: revisiting BMI with sleep as a key factor 
 #  Additional question: What if sleep quality and sleep duration were stronger predictors of BMI than age or physical activity?
 
 # While the initial analysis showed clear differences in BMI across occupations the explanation wasn’t fully satisfying. Age, gender, and physical activity provided some clues, but they couldn’t explain everything.
+def bmi_sleep_chart(summary):
+    means = summary.means
+    bmi_percent = summary.category_pct("BMI Category")
+
 
-# combine overweight + obese percentages to represent the total proportion of participants in each occupation with above-normal BMI
-bmi_overweight_obese = bmi_percent["Overweight"] + bmi_percent["Obese"]
+    # combine overweight + obese percentages to represent the total proportion of participants in each occupation with above-normal BMI
+    bmi_overweight_obese = bmi_percent["Overweight"] + bmi_percent["Obese"]
 
-# get average sleep quality and duration by occupation
-sleep_quality = filtered_df.groupby("Occupation")["Quality of Sleep"].mean()
-sleep_duration = filtered_df.groupby("Occupation")["Sleep Duration"].mean()
+    # get average sleep quality and duration by occupation
+    sleep_quality = means["Quality of Sleep"]
+    sleep_duration = means["Sleep Duration"]
 
-# scatter plot BMI vs sleep quality to visualize correlation
-fig, ax = plt.subplots(1, 2, figsize=(10,4))
+    # scatter plot BMI vs sleep quality to visualize correlation
+    fig, ax = plt.subplots(1, 2, figsize=(10,4))
 
 
-ax[0].scatter(sleep_quality, bmi_overweight_obese)
-for i, occ in enumerate(bmi_overweight_obese.index):
-    ax[0].annotate(occ, (sleep_quality.iloc[i], bmi_overweight_obese.iloc[i]))
-ax[0].set_xlabel("Average Sleep Quality")
-ax[0].set_ylabel("% Overweight + Obese")
-ax[0].set_title("BMI vs Sleep Quality by Occupation")
+    ax[0].scatter(sleep_quality, bmi_overweight_obese)
+    for i, occ in enumerate(bmi_overweight_obese.index):
+        ax[0].annotate(occ, (sleep_quality.iloc[i], bmi_overweight_obese.iloc[i]))
+    ax[0].set_xlabel("Average Sleep Quality")
+    ax[0].set_ylabel("% Overweight + Obese")
+    ax[0].set_title("BMI vs Sleep Quality by Occupation")
 
-# Scatter plot BMI vs Sleep Duration
-ax[1].scatter(sleep_duration, bmi_overweight_obese)
-for i, occ in enumerate(bmi_overweight_obese.index):
-    ax[1].annotate(occ, (sleep_duration.iloc[i], bmi_overweight_obese.iloc[i]))
-ax[1].set_xlabel("Average Sleep Duration (hours)")
-ax[1].set_ylabel("% Overweight + Obese")
-ax[1].set_title("BMI vs Sleep Duration by Occupation")
+    # Scatter plot BMI vs Sleep Duration
+    ax[1].scatter(sleep_duration, bmi_overweight_obese)
+    for i, occ in enumerate(bmi_overweight_obese.index):
+        ax[1].annotate(occ, (sleep_duration.iloc[i], bmi_overweight_obese.iloc[i]))
+    ax[1].set_xlabel("Average Sleep Duration (hours)")
+    ax[1].set_ylabel("% Overweight + Obese")
+    ax[1].set_title("BMI vs Sleep Duration by Occupation")
+
+    plt.tight_layout()
+    return fig
 
-plt.tight_layout()
-plt.show()
 
 # Conclusion
 
@@ -375,4 +397,119 @@ plt.show()
 # Sleep quality and duration strongly correlate with BMI outcomes across occupations.
 # Occupations with poor sleep (sales, teachers, nurses) consistently show worse BMI, even if physical activity is high.
 # Engineers and lawyers maintain healthy weights possibly due to better sleep routines, even with sedentary work and older age.
-# Doctors are a special case, they sleep habits are poor but they are able stay healthy, likely due to other unmeasured lifestyle factors.
\ No newline at end of file
+# Doctors are a special case, they sleep habits are poor but they are able stay healthy, likely due to other unmeasured lifestyle factors.
+
+
+# -------
+# QUESTION 4: Do blood pressure, heart rate and daily steps follow the same occupational patterns?
+def cardio_chart(summary):
+    means = summary.means
+    labels = summary.occupations.tolist()
+    x = np.arange(len(labels))
+
+    # share of each blood pressure stage (every reading was staged when the data was loaded)
+    bp_percent = summary.category_pct("BP Stage").reindex(columns=BP_STAGES, fill_value=0)
+
+    fig, ax = plt.subplots(1, 3, figsize=(15, 5))
+
+    # stacked bars from normal to stage 2
+    bottom = np.zeros(len(labels))
+    for stage, color in zip(BP_STAGES, ["tab:green", "tab:olive", "tab:orange", "tab:red"]):
+        ax[0].bar(x, bp_percent[stage], bottom=bottom, label=stage, color=color)
+        bottom += bp_percent[stage].to_numpy()
+    ax[0].set_xticks(x)
+    ax[0].set_xticklabels(labels, rotation=45)
+    ax[0].set_ylabel("Percentage")
+    ax[0].set_ylim(0, 115)  # room for the legend above the 100% stacks
+    ax[0].set_title("Blood Pressure Stage by Occupation")
+    ax[0].legend(fontsize=8, ncol=4, loc="upper center")
+
+    # heart rate vs stress
+    ax[1].scatter(means["Stress Level"], means["Heart Rate"], color="tab:red")
+    for i, occ in enumerate(labels):
+        ax[1].annotate(occ, (means["Stress Level"].iloc[i], means["Heart Rate"].iloc[i]))
+    ax[1].set_xlabel("Average Stress Level")
+    ax[1].set_ylabel("Average Heart Rate (bpm)")
+    ax[1].set_title("Heart Rate vs Stress")
+
+    # daily steps vs sleep quality
+    ax[2].scatter(means["Daily Steps"], means["Quality of Sleep"])
+    for i, occ in enumerate(labels):
+        ax[2].annotate(occ, (means["Daily Steps"].iloc[i], means["Quality of Sleep"].iloc[i]))
+    ax[2].set_xlabel("Average Daily Steps")
+    ax[2].set_ylabel("Average Sleep Quality")
+    ax[2].set_title("Sleep Quality vs Daily Steps")
+
+    plt.tight_layout()
+    return fig
+
+
+# Conclusion:
+# Nurses (89%) and teachers (70%) have by far the most stage 2 hypertension, the same groups with the most sleep apnea and insomnia.
+# Accountants are the only group where most readings are normal (84%); most doctors, engineers, lawyers and sales workers are stage 1.
+# Heart rate rises with stress (sales ~73 bpm at stress 7.1, engineers ~68 bpm at stress 4.0).
+# Daily steps barely relate to sleep quality: nurses walk the most but sleep only averagely, engineers sleep best with ~6,000 steps.
+
+
+# charts in the order the analysis presents them
+CHARTS = {
+    "sleep_disorders": sleep_disorders_chart,
+    "stress_sleep_activity": stress_sleep_chart,
+    "bmi_age": bmi_age_chart,
+    "bmi_sleep": bmi_sleep_chart,
+    "cardio": cardio_chart
+}
+
+
+# draw one chart off-screen and write it in every requested format
+def render_chart(name, summary, output, formats):
+    plt.switch_backend("Agg")
+    start = time.perf_counter()
+    fig = CHARTS[name](summary)
+    for fmt in formats:
+        fig.savefig(os.path.join(output, f"{name}.{fmt}"), format=fmt)
+    plt.close(fig)
+    return time.perf_counter() - start
+
+
+# the charts are independent, so each one renders in its own worker process
+def render_headless(summary, output, formats, workers=None):
+    os.makedirs(output, exist_ok=True)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = {name: pool.submit(render_chart, name, summary, output, formats) for name in CHARTS}
+        for name, job in jobs.items():
+            print(f"{name}: {job.result():.2f}s")
+    print(f"total: {time.perf_counter() - start:.2f}s ({len(CHARTS)} charts -> {output})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sleep health and lifestyle analysis by occupation")
+    parser.add_argument("csv", nargs="?", default=DATA_FILE, help="survey csv to analyze")
+    parser.add_argument(
+        "--chunksize", type=int,
+        help="stream the csv in chunks of this many rows instead of loading it whole"
+    )
+    parser.add_argument(
+        "--output",
+        help="headless mode: write every chart to this directory (Agg backend) instead of showing them"
+    )
+    parser.add_argument("--format", nargs="+", default=["png"], choices=["png", "svg"], help="headless output formats")
+    parser.add_argument("--workers", type=int, help="headless render processes (default: one per core)")
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND, help="aggregation engine (default: $HEALTH_BACKEND or pandas)")
+    args = parser.parse_args()
+
+    summary = load_summary(args.csv, args.chunksize, args.backend)
+
+    if args.output:
+        render_headless(summary, args.output, args.format, args.workers)
+        return
+
+    for chart in CHARTS.values():
+        chart(summary)
+        plt.show()
+        plt.close()
+
+
+if __name__ == "__main__":
+    main()
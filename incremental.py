@@ -0,0 +1,202 @@
+import hashlib
+import io
+import logging
+import os
+import pickle
+import threading
+
+import pandas as pd
+
+from aggregates import merge_all, summarize
+from dataset import CACHE_VERSION, DATA_FILE, RULES_DIGEST, SCHEMA, prepare
+
+# bytes read per step when catching up on appended rows
+BLOCK_SIZE = 64 * 1024 * 1024
+
+logger = logging.getLogger("workplace_health.incremental")
+
+
+# per-occupation aggregates (with the Pearson cross-products) of a csv that only grows:
+# remembers the byte offset and row count already folded in, so a refresh parses just
+# the newly appended rows
+class IncrementalSummary:
+    def __init__(self, path=DATA_FILE, state_path=None):
+        self.path = path
+        self.state_path = state_path or os.path.splitext(path)[0] + ".summary.pkl"
+        self._lock = threading.Lock()
+        self._reset()
+        self._load_state()
+
+    def _reset(self):
+        self.header = b""
+        self.offset = 0         # end of the last complete (newline-terminated) row folded in
+        self.rows = 0
+        self.rejected = 0       # appended rows that failed the schema and were left out
+        self.committed = None   # summary of every row before offset
+        self.head_digest = None
+        self._clear_tail()
+
+    # a last row without a newline is counted but kept apart, since it may still be
+    # being written; it is re-read with the next appended block
+    def _clear_tail(self):
+        self.tail = None
+        self.tail_rows = 0
+        self.tail_size = 0
+
+    # summary and version read the state without the lock; outside this class use the
+    # snapshot refresh() returns
+    @property
+    def summary(self):
+        if self.tail is None:
+            return self.committed
+        if self.committed is None:
+            return self.tail
+        return self.committed.merge(self.tail)
+
+    @property
+    def total_rows(self):
+        return self.rows + self.tail_rows
+
+    # identifies the data folded in so far (for cache keys)
+    @property
+    def version(self):
+        return f"{self.head_digest}:{self.offset + self.tail_size}"
+
+    # header plus first data row identify the file; if they change it was replaced, not appended to
+    def _head(self, f):
+        f.seek(0)
+        head = f.readline() + f.readline()
+        return hashlib.sha256(head).hexdigest()
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, "rb") as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return
+        # a summary built with other cleaning rules or another schema is rebuilt from the start
+        if (
+            state.get("path") == os.path.abspath(self.path)
+            and state.get("rules") == RULES_DIGEST
+            and state.get("version") == CACHE_VERSION
+        ):
+            self.header = state["header"]
+            self.offset = state["offset"]
+            self.rows = state["rows"]
+            self.rejected = state.get("rejected", 0)
+            self.committed = state["committed"]
+            self.head_digest = state["head_digest"]
+
+    def _save_state(self):
+        state = {
+            "path": os.path.abspath(self.path),
+            "rules": RULES_DIGEST,
+            "version": CACHE_VERSION,
+            "header": self.header,
+            "offset": self.offset,
+            "rows": self.rows,
+            "rejected": self.rejected,
+            "committed": self.committed,
+            "head_digest": self.head_digest
+        }
+        tmp_path = self.state_path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+        except OSError:
+            pass  # read-only deployment, the next process catches up from the start
+
+    def _parse(self, data):
+        return prepare(pd.read_csv(io.BytesIO(self.header + data), dtype=SCHEMA))
+
+    # frames of the rows in a block that pass the schema; a failing block is halved on a
+    # row boundary until the bad rows are isolated, and those are logged and left out so
+    # one malformed line doesn't hold back (or crash) every later refresh
+    def _parse_rows(self, block, start, rejected):
+        try:
+            return [self._parse(block)]
+        except ValueError as error:
+            if block.count(b"\n") <= 1:
+                logger.warning("skipping malformed row at byte %d of %s: %s", start, self.path, error)
+                rejected.append(start)
+                return []
+        middle = block.rfind(b"\n", 0, len(block) // 2) + 1 or block.find(b"\n") + 1
+        return (
+            self._parse_rows(block[:middle], start, rejected)
+            + self._parse_rows(block[middle:], start + middle, rejected)
+        )
+
+    # fold any rows appended since the last call; returns (summary, version, new rows) as
+    # one snapshot taken under the lock, so the summary and its version always agree
+    # even while another session is folding in rows (malformed ones are skipped and
+    # counted in `rejected`)
+    def refresh(self):
+        with self._lock:
+            added = self._catch_up()
+            return self.summary, self.version, added
+
+    def _catch_up(self):
+        size = os.path.getsize(self.path)
+        with open(self.path, "rb") as f:
+            head_digest = self._head(f)
+            if size < self.offset or (self.offset and head_digest != self.head_digest):
+                self._reset()
+            if size == self.offset + self.tail_size and self.head_digest is not None:
+                return 0
+
+            offset = self.offset
+            if self.offset == 0:
+                f.seek(0)
+                self.header = f.readline()
+                self.offset = len(self.header)
+                self.head_digest = head_digest
+
+            added = self._fold(f, size)
+
+        if added or self.offset != offset:
+            self._save_state()
+        return added
+
+    # nothing is committed until every block has parsed, so a block that fails leaves
+    # offset, rows and the summary as they were and the whole range is read again
+    def _fold(self, f, size):
+        offset = self.offset
+        f.seek(offset)
+        partials = []
+        added = 0
+        rejected = []
+        pending = b""
+        while f.tell() < size:
+            pending += f.read(min(BLOCK_SIZE, size - f.tell()))
+            end = pending.rfind(b"\n") + 1
+            if end == 0:
+                continue
+            block, pending = pending[:end], pending[end:]
+            for chunk in self._parse_rows(block, offset, rejected):
+                if len(chunk):
+                    partials.append(summarize(chunk, cross=True))
+                    added += len(chunk)
+            offset += end
+
+        tail = None
+        if pending.strip():
+            try:
+                tail = self._parse(pending)
+            except ValueError:
+                tail = None  # row cut off mid-write, picked up once it is complete
+
+        if partials:
+            if self.committed is not None:
+                partials.insert(0, self.committed)
+            self.committed = merge_all(partials)
+            self.rows += added
+        self.rejected += len(rejected)
+        self.offset = offset
+
+        self._clear_tail()
+        if tail is not None and len(tail):
+            self.tail = summarize(tail, cross=True)
+            self.tail_rows = len(tail)
+            self.tail_size = len(pending)
+        return added
@@ -0,0 +1,93 @@
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+# one json object per line, for the log pipeline
+logger = logging.getLogger("workplace_health.perf")
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# peak memory tracking can be switched off where tracemalloc's overhead matters
+TRACE_MEMORY = os.environ.get("HEALTH_TRACEMALLOC", "1") != "0"
+
+# set by cached functions when their body actually runs (a cache miss);
+# thread-local because every Streamlit session reruns in its own thread
+_calls = threading.local()
+
+
+def note_miss(name):
+    if not hasattr(_calls, "missed"):
+        _calls.missed = set()
+    _calls.missed.add(name)
+
+
+# wall time, thread CPU time and peak traced memory for each named stage of one rerun
+class StageTimer:
+    def __init__(self, trace_memory=TRACE_MEMORY):
+        self.run_id = uuid.uuid4().hex[:8]
+        self.records = []
+        self.trace_memory = trace_memory
+        self.finished = False
+        self._start = time.perf_counter()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name, **fields):
+        if self.trace_memory:
+            # peaks are process-wide, so concurrent sessions can inflate each other's numbers
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield fields
+        finally:
+            record = {
+                "stage": name,
+                "wall_ms": round((time.perf_counter() - wall) * 1000, 2),
+                "cpu_ms": round((time.thread_time() - cpu) * 1000, 2),
+                "peak_kb": round((tracemalloc.get_traced_memory()[1] - baseline) / 1024, 1) if self.trace_memory else None
+            }
+            record.update(fields)
+            self.records.append(record)
+            self.log("stage", **record)
+
+    # time a st.cache_data function and record whether it was served from the cache
+    def cached(self, name, func, *args, **kwargs):
+        _calls.missed = set()
+        with self.stage(name) as fields:
+            result = func(*args, **kwargs)
+            fields["cache"] = "miss" if name in _calls.missed else "hit"
+        return result
+
+    def total_ms(self):
+        return round((time.perf_counter() - self._start) * 1000, 2)
+
+    def log(self, event, **fields):
+        logger.info(json.dumps({"event": event, "run": self.run_id, "ts": round(time.time(), 3), **fields}))
+
+    def finish(self):
+        self.finished = True
+        self.log("rerun", wall_ms=self.total_ms(), stages=len(self.records))
+
+    # timer for a fragment's stages: the page's own while the page is running, or a
+    # fresh one logged as a rerun of just that section when the fragment reruns alone
+    @contextmanager
+    def section(self, name):
+        if not self.finished:
+            yield self
+            return
+        timer = StageTimer(self.trace_memory)
+        timer.run_id = self.run_id
+        yield timer
+        timer.log("fragment_rerun", section=name, wall_ms=timer.total_ms(), stages=len(timer.records))
@@ -0,0 +1,37 @@
+import time
+from concurrent.futures import as_completed
+
+
+# run `work()` and report how long it took, for the timer of the thread that shows it
+def timed(work):
+    start = time.perf_counter()
+    result = work()
+    return result, round((time.perf_counter() - start) * 1000, 2)
+
+
+# chart work started on a background pool while the page keeps writing its text; each
+# result is handed to its `show` callback (which fills a placeholder) once drained
+class Pending:
+    def __init__(self, pool):
+        self.pool = pool
+        self.jobs = []
+        self.closed = False
+
+    # after drain() there is no later pass to wait for (a fragment rerunning on its
+    # own), so the result is shown as soon as it is ready
+    def submit(self, work, show):
+        future = self.pool.submit(timed, work)
+        if self.closed:
+            show(*future.result())
+        else:
+            self.jobs.append((future, show))
+        return future
+
+    # fill the placeholders in the order their work finishes; Streamlit calls must
+    # stay on the script thread, so only the work itself ran on the pool
+    def drain(self):
+        self.closed = True
+        shows = dict(self.jobs)
+        self.jobs = []
+        for future in as_completed(shows):
+            shows[future](*future.result())
@@ -0,0 +1,70 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# rows sent to the browser at a time
+PAGE_SIZE = 100
+
+
+# numeric columns the viewer can filter on with a range
+def range_columns(df):
+    return [column for column in df.columns if df[column].dtype.kind in "iuf"]
+
+
+# (min, max) of every numeric column as plain numbers for the range sliders (floats
+# rounded, filter_mask compares in the column's own precision)
+def column_bounds(df):
+    bounds = {}
+    for column in range_columns(df):
+        low, high = df[column].min().item(), df[column].max().item()
+        if isinstance(low, float):
+            low, high = round(low, 2), round(high, 2)
+        bounds[column] = (low, high)
+    return bounds
+
+
+# rows matching every filter as one boolean mask: occupations are compared on the
+# categorical codes and ranges on the numeric arrays directly, so no row is copied;
+# ranges are (column, low, high) triples, both ends included
+def filter_mask(df, occupations=(), ranges=()):
+    mask = np.ones(len(df), dtype=bool)
+    if occupations:
+        column = df["Occupation"].cat
+        wanted = column.categories.get_indexer(list(occupations))
+        mask &= np.isin(column.codes.to_numpy(), wanted[wanted >= 0])
+    for column, low, high in ranges:
+        values = df[column].to_numpy()
+        kind = values.dtype.type
+        mask &= (values >= kind(low)) & (values <= kind(high))
+    return mask
+
+
+# sort keys of the given rows only; categorical codes follow the category order (labels
+# sorted by the cleaning, BP Stage by severity), missing labels go last like pandas
+def sort_keys(values, rows):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()[rows]
+        return np.where(codes < 0, len(values.cat.categories), codes).astype("float64")
+    return values.to_numpy()[rows].astype("float64")
+
+
+# positions of the matching rows in display order (file order unless sorted); the
+# count of matches is just their length
+def matching_rows(df, occupations=(), ranges=(), sort=None, ascending=True):
+    rows = np.flatnonzero(filter_mask(df, occupations, ranges))
+    if sort:
+        keys = sort_keys(df[sort], rows)
+        rows = rows[np.argsort(keys if ascending else -keys, kind="stable")]
+    return rows
+
+
+def page_count(total, size=PAGE_SIZE):
+    return max(1, math.ceil(total / size))
+
+
+# only the rows of one page (1-based) are taken from the frame, then the columns
+def page(df, rows, number, size=PAGE_SIZE, columns=None):
+    start = (number - 1) * size
+    window = df.take(rows[start:start + size])
+    return window if columns is None else window[list(columns)]
@@ -0,0 +1,179 @@
+import argparse
+import base64
+import html
+import os
+import re
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+
+from aggregates import BACKEND, BACKENDS, question_tables, summarize_file
+from bootstrap import BootstrapRates
+from charts import (
+    METRICS, bmi_figure, bmi_table, bp_figure, bp_table, disorder_figure, disorder_table, figure_bytes,
+    heart_figure, heart_table, sleep_bmi_figure, sleep_bmi_table, stress_figure, stress_table
+)
+from content import (
+    CARDIO_CONCLUSION, CARDIO_INTRO, CARDIO_TITLE, CORRELATION_INTRO, EXT_CONCLUSION, EXT_INTRO,
+    EXT_TITLE, Q1_CONCLUSION, Q1_INTRO, Q1_TITLE, Q2_CONCLUSION, Q2_INTRO, Q2_TITLE, Q3_CONCLUSION,
+    Q3_INTRO, Q3_TITLE, STUDY_CONCLUSION, STUDY_TITLE, TITLE
+)
+from correlations import Correlations
+from dataset import DATA_FILE, dataset_version
+
+# the dashboard's default widget values
+DEFAULT_BMI = ["Overweight", "Obese"]
+
+STYLE = """
+body { font-family: sans-serif; max-width: 860px; margin: 2em auto; padding: 0 1em; line-height: 1.5; color: #262730; }
+img { max-width: 100%; }
+table { border-collapse: collapse; font-size: 0.85em; margin: 0.5em 0; }
+th, td { border: 1px solid #ddd; padding: 2px 8px; text-align: right; }
+details { margin: 0.5em 0 1em; }
+footer { text-align: center; font-size: 0.8em; margin-top: 3em; }
+"""
+
+MIME_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+# just enough Markdown for the texts in content.py: headings, rules, bullet lists,
+# paragraphs with hard line breaks, bold, italics and links
+def inline(text):
+    text = html.escape(text, quote=False)
+    text = re.sub(r"\[([^\]]+)\]\(([^)\s]+)\)", r'<a href="\2">\1</a>', text)
+    text = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", text)
+    return re.sub(r"\*(.+?)\*", r"<em>\1</em>", text)
+
+
+def markdown_html(text):
+    blocks = []
+    paragraph = []
+    items = []
+
+    def flush():
+        if paragraph:
+            blocks.append("<p>" + "\n".join(paragraph) + "</p>")
+            paragraph.clear()
+        if items:
+            blocks.append("<ul>" + "".join(f"<li>{item}</li>" for item in items) + "</ul>")
+            items.clear()
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        heading = re.match(r"(#{1,6})\s+(.*)", line)
+        if not line:
+            flush()
+        elif line == "---":
+            flush()
+            blocks.append("<hr>")
+        elif heading:
+            flush()
+            level = len(heading.group(1))
+            blocks.append(f"<h{level}>{inline(heading.group(2))}</h{level}>")
+        elif line.startswith("- "):
+            if paragraph:
+                flush()
+            items.append(inline(line[2:]))
+        else:
+            if items:
+                flush()
+            paragraph.append(inline(line) + ("<br>" if raw.endswith("  ") else ""))
+    flush()
+    return "\n".join(blocks)
+
+
+def image(fig, fmt):
+    data = base64.b64encode(figure_bytes(fig, fmt)).decode()
+    return f'<img src="data:{MIME_TYPES[fmt]};base64,{data}">'
+
+
+def table_html(df, caption):
+    return f"<details><summary>{html.escape(caption)}</summary>{df.to_html(float_format='{:.1f}'.format)}</details>"
+
+
+# the dashboard's default view (every eligible occupation, every metric, overweight +
+# obese) plus the analysis script's tables, as one self-contained html page; the
+# Pearson matrix comes from the same pass's cross-products, so the csv is read once
+# (in chunks with chunksize, or by SQL with the duckdb backend)
+def build_report(csv=DATA_FILE, fmt="png", live_url=None, backend=None, chunksize=None):
+    start = time.perf_counter()
+    cube = summarize_file(csv, chunksize, backend, cross=True)
+    valid_jobs = set(cube.eligible(5))
+    summary = cube.select([occ for occ in cube.occupations if occ in valid_jobs])
+    labels = summary.occupations.tolist()
+    tables = question_tables(cube)
+
+    disorder_pct = disorder_table(summary, labels, BootstrapRates(cube.category_counts("Sleep Disorder")))
+    means = stress_table(summary, labels)
+    bmi_by_occupation = bmi_table(summary, labels, DEFAULT_BMI, BootstrapRates(cube.category_counts("BMI Category")))
+    sleep_bmi = sleep_bmi_table(summary, labels)
+    bp_by_occupation = bp_table(summary, labels)
+    heart = heart_table(summary, labels)
+    correlation = Correlations(cube.cross).matrix("pearson")
+
+    live = f' For other occupations or metrics, use the <a href="{html.escape(live_url)}">live dashboard</a>.' if live_url else ""
+    sections = [
+        f"<h1>{html.escape(TITLE)}</h1>",
+        f"<p><small>Default view of {int(cube.counts.sum())} respondents, built "
+        f"{time.strftime('%Y-%m-%d %H:%M')} from {html.escape(os.path.basename(csv))} "
+        f"(version {dataset_version(csv)[:12]}).{live}</small></p>",
+
+        f"<h3>{html.escape(Q1_TITLE)}</h3>", markdown_html(Q1_INTRO),
+        image(disorder_figure(disorder_pct), fmt),
+        table_html(tables["disorders"], "Sleep disorders by occupation (%)"),
+        "<h4>Conclusion</h4>", markdown_html(Q1_CONCLUSION), "<hr>",
+
+        f"<h3>{html.escape(Q2_TITLE)}</h3>", markdown_html(Q2_INTRO),
+        image(stress_figure(means, METRICS), fmt),
+        table_html(tables["stress_sleep"], "Average stress, sleep and physical activity"),
+        "<h4>Conclusion</h4>", markdown_html(Q2_CONCLUSION), "<hr>",
+
+        f"<h3>{html.escape(Q3_TITLE)}</h3>", markdown_html(Q3_INTRO),
+        image(bmi_figure(bmi_by_occupation, DEFAULT_BMI), fmt),
+        table_html(tables["bmi"].join(tables["gender"]).assign(Age=tables["age"]), "BMI, gender (%) and average age"),
+        "<h4>Conclusion</h4>", markdown_html(Q3_CONCLUSION), "<hr>",
+
+        f"<h3>{html.escape(EXT_TITLE)}</h3>", markdown_html(EXT_INTRO),
+        image(sleep_bmi_figure(sleep_bmi), fmt),
+        markdown_html(CORRELATION_INTRO),
+        correlation.to_html(float_format="{:.2f}".format, na_rep="–"),
+        "<h4>Conclusion</h4>", markdown_html(EXT_CONCLUSION), "<hr>",
+
+        f"<h3>{html.escape(CARDIO_TITLE)}</h3>", markdown_html(CARDIO_INTRO),
+        image(bp_figure(bp_by_occupation), fmt),
+        image(heart_figure(heart), fmt),
+        table_html(tables["bp"].join(tables["cardio"]), "Blood pressure stage (%), heart rate, stress, steps and sleep quality"),
+        "<h4>Conclusion</h4>", markdown_html(CARDIO_CONCLUSION), "<hr>",
+
+        f"<h3>{html.escape(STUDY_TITLE)}</h3>", markdown_html(STUDY_CONCLUSION),
+        "<footer>© 2025 Sara Latorre – Built using Streamlit</footer>"
+    ]
+    page = (
+        f'<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+        f'<meta name="viewport" content="width=device-width, initial-scale=1">\n'
+        f"<title>{html.escape(TITLE)}</title>\n<style>{STYLE}</style>\n</head>\n<body>\n"
+        + "\n".join(sections) + "\n</body>\n</html>\n"
+    )
+    return page, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the default dashboard view as one static html page")
+    parser.add_argument("csv", nargs="?", default=DATA_FILE, help="survey csv to report on")
+    parser.add_argument("--output", default=os.path.join("report", "index.html"), help="html file to write")
+    parser.add_argument("--format", choices=list(MIME_TYPES), default="png", help="embedded chart format")
+    parser.add_argument("--live-url", help="link to the live dashboard for custom filtering")
+    parser.add_argument("--chunksize", type=int, help="stream the csv in chunks of this many rows instead of loading it whole")
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND, help="aggregation engine (default: $HEALTH_BACKEND or pandas)")
+    args = parser.parse_args()
+
+    page, elapsed = build_report(args.csv, args.format, args.live_url, args.backend, args.chunksize)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(page)
+    print(f"{args.output}: {len(page) / 1e6:.1f} MB in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
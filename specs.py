@@ -0,0 +1,275 @@
+from charts import BP_COLORS, DISORDERS, METRICS
+from dataset import BP_STAGES
+
+# matplotlib's default colors so both render modes look alike
+COLORS = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728"]
+RED = "#d62728"
+
+
+# Vega-Lite specs for the dashboard charts, drawn by the browser from the
+# small per-occupation tables in charts.py; each returns (data, spec)
+
+def occupation_axis(labels):
+    return {"field": "Occupation", "type": "nominal", "sort": labels, "axis": {"labelAngle": -45}, "title": None}
+
+
+# vertical interval rules from "low"/"high" fields, drawn over the bars
+def error_layer(low, high):
+    return {
+        "mark": {"type": "errorbar", "ticks": True},
+        "encoding": {
+            "y": {"field": low, "type": "quantitative"},
+            "y2": {"field": high},
+            "tooltip": [{"field": low, "format": ".1f", "title": "95% CI low"},
+                        {"field": high, "format": ".1f", "title": "95% CI high"}]
+        }
+    }
+
+
+# 1. Sleep disorder distribution by occupation, grouped bars with % labels
+# (and bootstrap error bars when the table has "<disorder> low"/"high" columns)
+def disorder_spec(table):
+    labels = table.index.tolist()
+    data = table.rename_axis("Occupation").reset_index()
+    intervals = "Insomnia low" in table.columns
+    bars = {
+        "x": occupation_axis(labels),
+        "xOffset": {"field": "Disorder", "sort": DISORDERS},
+        "y": {"field": "Percentage", "type": "quantitative", "title": "Percentage", "scale": {"domain": [0, 100]}}
+    }
+    transform = [
+        {"fold": DISORDERS, "as": ["Disorder", "Percentage"]},
+        {"calculate": "format(datum.Percentage, '.1f') + '%'", "as": "Label"}
+    ]
+    if intervals:
+        transform += [
+            {"calculate": "datum[datum.Disorder + ' low']", "as": "Low"},
+            {"calculate": "datum[datum.Disorder + ' high']", "as": "High"}
+        ]
+    layers = [
+        {
+            "mark": "bar",
+            "encoding": {
+                "color": {"field": "Disorder", "type": "nominal", "sort": DISORDERS,
+                          "scale": {"domain": DISORDERS, "range": COLORS[:3]}},
+                "tooltip": [{"field": "Occupation"}, {"field": "Disorder"},
+                            {"field": "Percentage", "format": ".1f"}]
+            }
+        },
+        {
+            "mark": {"type": "text", "dy": -5, "fontSize": 8},
+            "encoding": {
+                "text": {"field": "Label"},
+                "y": {"field": "High" if intervals else "Percentage", "type": "quantitative"}
+            }
+        }
+    ]
+    if intervals:
+        layers.insert(1, error_layer("Low", "High"))
+    spec = {
+        "title": "Sleep Disorders by Occupation (%)",
+        "transform": transform,
+        "encoding": bars,
+        "layer": layers
+    }
+    return data, spec
+
+
+# 2. Stress, sleep duration and sleep quality bars with physical activity on its own axis
+def stress_spec(table, selected_metrics):
+    labels = table.index.tolist()
+    data = table.rename_axis("Occupation").reset_index()
+    series = METRICS + ["Physical Activity"]
+    color_scale = {"domain": series, "range": COLORS}
+    metrics = [metric for metric in METRICS if metric in selected_metrics]
+
+    spec = {
+        "title": "Stress, Sleep, and Physical Activity by Occupation",
+        "layer": [
+            {
+                "transform": [{"fold": metrics, "as": ["Metric", "Value"]}],
+                "mark": "bar",
+                "encoding": {
+                    "x": occupation_axis(labels),
+                    "xOffset": {"field": "Metric", "sort": metrics},
+                    "y": {"field": "Value", "type": "quantitative", "title": "Scale (0–10)",
+                          "scale": {"domain": [0, 10]}},
+                    "color": {"field": "Metric", "type": "nominal", "scale": color_scale, "title": None},
+                    "tooltip": [{"field": "Occupation"}, {"field": "Metric"},
+                                {"field": "Value", "format": ".1f"}]
+                }
+            },
+            {
+                "mark": {"type": "line", "point": True, "strokeWidth": 2},
+                "encoding": {
+                    "x": occupation_axis(labels),
+                    "y": {"field": "Physical Activity Level", "type": "quantitative",
+                          "title": "Physical Activity Level (0–100)", "scale": {"domain": [0, 100]}},
+                    "color": {"datum": "Physical Activity", "scale": color_scale},
+                    "tooltip": [{"field": "Occupation"},
+                                {"field": "Physical Activity Level", "format": ".1f"}]
+                }
+            }
+        ],
+        "resolve": {"scale": {"y": "independent"}}
+    }
+    return data, spec
+
+
+# 3. BMI category share by occupation with dominant gender labels and average age
+def bmi_spec(table, selected_bmi):
+    labels = table.index.tolist()
+    data = table.rename_axis("Occupation").reset_index()
+    title = "% " + " + ".join(selected_bmi) if selected_bmi else "BMI %"
+    tops = table.get("BMI % high", table["BMI %"])
+    y_max = (tops.max() if selected_bmi else 1) + 10
+    age = table["Average Age"]
+    bar_y = {"field": "BMI %", "type": "quantitative", "title": title, "scale": {"domain": [0, y_max]}}
+    bar_layers = [
+        {
+            "mark": {"type": "bar", "color": "steelblue"},
+            "encoding": {
+                "tooltip": [{"field": "Occupation"}, {"field": "BMI %", "format": ".1f"},
+                            {"field": "Gender"}]
+            }
+        },
+        {
+            "mark": {"type": "text", "dy": -8, "fontSize": 9},
+            "encoding": {
+                "text": {"field": "Gender"},
+                "y": {"field": "BMI % high" if "BMI % high" in table.columns else "BMI %", "type": "quantitative"}
+            }
+        }
+    ]
+    if "BMI % low" in table.columns:
+        bar_layers.insert(1, error_layer("BMI % low", "BMI % high"))
+
+    spec = {
+        "title": "BMI Rate vs Age by Occupation",
+        "layer": [
+            {
+                "layer": bar_layers,
+                "encoding": {"x": occupation_axis(labels), "y": bar_y}
+            },
+            {
+                "mark": {"type": "line", "point": True, "strokeWidth": 2},
+                "encoding": {
+                    "x": occupation_axis(labels),
+                    "y": {"field": "Average Age", "type": "quantitative", "title": "Average Age",
+                          "scale": {"domain": [float(age.min()) * 0.95, float(age.max()) * 1.05]}},
+                    "color": {"datum": "Average Age", "scale": {"range": [RED]}, "title": None},
+                    "tooltip": [{"field": "Occupation"}, {"field": "Average Age", "format": ".1f"}]
+                }
+            }
+        ],
+        "resolve": {"scale": {"y": "independent"}}
+    }
+    return data, spec
+
+
+# cohort comparison: one facet per metric, a bar per cohort within each occupation
+def cohort_spec(table, title, ylabel):
+    labels = list(dict.fromkeys(table["Occupation"]))
+    cohorts = list(dict.fromkeys(table["Cohort"]))
+    metrics = list(dict.fromkeys(table["Metric"]))
+    spec = {
+        "title": title,
+        "facet": {"column": {"field": "Metric", "sort": metrics, "title": None}},
+        "spec": {
+            "mark": "bar",
+            "encoding": {
+                "x": occupation_axis(labels),
+                "xOffset": {"field": "Cohort", "sort": cohorts},
+                "y": {"field": "Value", "type": "quantitative", "title": ylabel},
+                "color": {"field": "Cohort", "type": "nominal", "sort": cohorts},
+                "tooltip": [{"field": "Cohort"}, {"field": "Occupation"}, {"field": "Metric"},
+                            {"field": "Value", "format": ".1f"}]
+            }
+        },
+        "resolve": {"scale": {"y": "independent"}}
+    }
+    return table, spec
+
+
+# 4. BMI vs sleep quality and sleep duration, side by side scatter plots
+def sleep_bmi_spec(table):
+    data = table.rename_axis("Occupation").reset_index()
+
+    def scatter(field, axis_title, title):
+        encoding = {
+            "x": {"field": field, "type": "quantitative", "title": axis_title, "scale": {"zero": False}},
+            "y": {"field": "% Overweight + Obese", "type": "quantitative"}
+        }
+        return {
+            "title": title,
+            "encoding": encoding,
+            "layer": [
+                {"mark": {"type": "point", "filled": True, "size": 60}},
+                {"mark": {"type": "text", "align": "left", "dx": 4, "dy": -4, "fontSize": 8},
+                 "encoding": {"text": {"field": "Occupation"}}}
+            ]
+        }
+
+    spec = {
+        "hconcat": [
+            scatter("Quality of Sleep", "Average Sleep Quality", "BMI vs Sleep Quality"),
+            scatter("Sleep Duration", "Average Sleep Duration (hrs)", "BMI vs Sleep Duration")
+        ]
+    }
+    return data, spec
+
+
+# 5. Blood pressure stage by occupation, stacked to 100%
+def bp_spec(table):
+    labels = table.index.tolist()
+    data = table.rename_axis("Occupation").reset_index()
+    spec = {
+        "title": "Blood Pressure Stage by Occupation (%)",
+        "transform": [
+            {"fold": BP_STAGES, "as": ["BP Stage", "Percentage"]},
+            # stack from normal at the bottom to stage 2 at the top, as in the matplotlib chart
+            {"calculate": f"indexof({BP_STAGES}, datum['BP Stage'])", "as": "Stage"}
+        ],
+        "mark": "bar",
+        "encoding": {
+            "x": occupation_axis(labels),
+            "y": {"field": "Percentage", "type": "quantitative", "title": "Percentage",
+                  "stack": "zero", "scale": {"domain": [0, 100]}},
+            "color": {"field": "BP Stage", "type": "nominal", "sort": BP_STAGES,
+                      "scale": {"domain": BP_STAGES, "range": BP_COLORS}},
+            "order": {"field": "Stage", "type": "ordinal"},
+            "tooltip": [{"field": "Occupation"}, {"field": "BP Stage"},
+                        {"field": "Percentage", "format": ".1f"}]
+        }
+    }
+    return data, spec
+
+
+# 5. Heart rate vs stress and daily steps vs sleep quality scatter plots
+def heart_spec(table):
+    data = table.rename_axis("Occupation").reset_index()
+
+    def scatter(x, x_title, y, y_title, title):
+        encoding = {
+            "x": {"field": x, "type": "quantitative", "title": x_title, "scale": {"zero": False}},
+            "y": {"field": y, "type": "quantitative", "title": y_title, "scale": {"zero": False}}
+        }
+        return {
+            "title": title,
+            "encoding": encoding,
+            "layer": [
+                {"mark": {"type": "point", "filled": True, "size": 60}},
+                {"mark": {"type": "text", "align": "left", "dx": 4, "dy": -4, "fontSize": 8},
+                 "encoding": {"text": {"field": "Occupation"}}}
+            ]
+        }
+
+    spec = {
+        "hconcat": [
+            scatter("Stress Level", "Average Stress Level", "Heart Rate", "Average Heart Rate (bpm)",
+                    "Heart Rate vs Stress"),
+            scatter("Daily Steps", "Average Daily Steps", "Quality of Sleep", "Average Sleep Quality",
+                    "Sleep Quality vs Daily Steps")
+        ]
+    }
+    return data, spec
@@ -0,0 +1,331 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:  # the pandas backend needs nothing extra
+    duckdb = None
+
+# what a failed query raises (bad rows in the csv included), for callers that report it
+SQL_ERRORS = (duckdb.Error,) if duckdb is not None else ()
+
+from aggregates import CATEGORY_COLUMNS, NUMERIC_COLUMNS, OccupationSummary
+from correlations import BMI_ORDER, FIELDS, CrossProducts
+from dataset import BP_STAGES, BP_THRESHOLDS, DATA_FILE, RULES
+from rawview import PAGE_SIZE
+
+# strings pandas reads as missing by default (its STR_NA_VALUES), so both backends
+# drop the same cells; the raw file writes "None" for no sleep disorder
+NULL_STRINGS = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"
+]
+
+# characters str.strip() removes from an ASCII label (SQL trim() alone only drops spaces)
+WHITESPACE = " \t\n\r\x0b\x0c"
+
+# raw csv column types, matching dataset.SCHEMA (Sleep Duration stays a 32-bit float so
+# sums come out exactly as in pandas)
+CSV_TYPES = {
+    "Person ID": "INTEGER",
+    "Age": "TINYINT",
+    "Sleep Duration": "FLOAT",
+    "Quality of Sleep": "TINYINT",
+    "Physical Activity Level": "TINYINT",
+    "Stress Level": "TINYINT",
+    "Heart Rate": "SMALLINT",
+    "Daily Steps": "INTEGER",
+    "Gender": "VARCHAR",
+    "Occupation": "VARCHAR",
+    "BMI Category": "VARCHAR",
+    "Blood Pressure": "VARCHAR",
+    "Sleep Disorder": "VARCHAR"
+}
+
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+# a column's cleaning rule (dataset.clean_label) as a SQL expression: fill, strip, rename
+def clean_expression(column, rule):
+    expression = quote(column)
+    if "missing" in rule:
+        expression = f"coalesce({expression}, {literal(rule['missing'])})"
+    if rule.get("strip"):
+        expression = f"trim({expression}, {literal(WHITESPACE)})"
+    if rule.get("rename"):
+        cases = " ".join(f"WHEN {literal(old)} THEN {literal(new)}" for old, new in rule["rename"].items())
+        expression = f"CASE {expression} {cases} ELSE {expression} END"
+    return f"{expression} AS {quote(column)}"
+
+
+# the two numbers of the raw "126/83" reading (dataset.parse_blood_pressure): NULL for a
+# missing reading and for one that is not two whole numbers around a "/" ("120", "abc/80")
+def reading_part(n):
+    return f"""TRY_CAST(split_part("Blood Pressure", '/', {n}) AS DOUBLE)"""
+
+
+VALID_READING = " AND ".join(
+    ["""len(string_split("Blood Pressure", '/')) = 2"""]
+    + [f"isfinite({reading_part(n)}) AND {reading_part(n)} = floor({reading_part(n)})" for n in (1, 2)]
+)
+SYSTOLIC = f"CASE WHEN {VALID_READING} THEN CAST({reading_part(1)} AS INTEGER) END"
+DIASTOLIC = f"CASE WHEN {VALID_READING} THEN CAST({reading_part(2)} AS INTEGER) END"
+
+
+# dataset.bp_stage as SQL over the raw "126/83" reading; a missing or malformed reading
+# has no stage (NULL, left out of the stage counts) rather than falling through to Normal
+def bp_stage_expression():
+    cases = [f"WHEN {SYSTOLIC} IS NULL THEN NULL"]
+    for stage in reversed(BP_STAGES[1:]):
+        systolic_from, diastolic_from = BP_THRESHOLDS[stage]
+        condition = f"{SYSTOLIC} >= {systolic_from}"
+        if diastolic_from is not None:
+            condition += f" OR {DIASTOLIC} >= {diastolic_from}"
+        cases.append(f"WHEN {condition} THEN {literal(stage)}")
+    return f"CASE {' '.join(cases)} ELSE {literal(BP_STAGES[0])} END AS {quote('BP Stage')}"
+
+
+def scan(path):
+    if path.endswith(".parquet"):
+        return f"read_parquet({literal(path)})"
+    types = ", ".join(f"{literal(name)}: {literal(kind)}" for name, kind in CSV_TYPES.items())
+    nulls = ", ".join(literal(value) for value in NULL_STRINGS)
+    return f"read_csv({literal(path)}, header = true, types = {{{types}}}, nullstr = [{nulls}])"
+
+
+# the cleaning in dataset.clean (and the staging in parse_blood_pressure), as SQL over
+# the raw file
+def cleaned(path, rules=None):
+    rules = rules or RULES
+    columns = ["Person ID"] + NUMERIC_COLUMNS + ["Systolic", "Diastolic", "Occupation"] + CATEGORY_COLUMNS
+    select = []
+    for column in columns:
+        if column == "Systolic":
+            select.append(f"{SYSTOLIC} AS {quote(column)}")
+        elif column == "Diastolic":
+            select.append(f"{DIASTOLIC} AS {quote(column)}")
+        elif column == "BP Stage":
+            select.append(bp_stage_expression())
+        elif column in rules:
+            select.append(clean_expression(column, rules[column]))
+        else:
+            select.append(quote(column))
+    return f"SELECT {', '.join(select)} FROM {scan(path)}"
+
+
+# one scan builds every per-occupation statistic: the grouping sets give the
+# occupation totals and each occupation x category count in the same pass
+def summary_query(path):
+    measures = []
+    for column in NUMERIC_COLUMNS:
+        value = f"CAST({quote(column)} AS DOUBLE)"
+        measures.append(f"sum({value}) AS {quote('sum ' + column)}")
+        measures.append(f"sum({value} * {value}) AS {quote('sumsq ' + column)}")
+    sets = ", ".join(["(\"Occupation\")"] + [f"(\"Occupation\", {quote(c)})" for c in CATEGORY_COLUMNS])
+    groupings = ", ".join(f"grouping({quote(c)}) AS {quote('grouped ' + c)}" for c in CATEGORY_COLUMNS)
+    return f"""
+        SELECT
+            "Occupation",
+            {", ".join(quote(c) for c in CATEGORY_COLUMNS)},
+            {groupings},
+            count(*) AS "count",
+            min("Person ID") AS "first",
+            {", ".join(measures)}
+        FROM ({cleaned(path)})
+        WHERE "Occupation" IS NOT NULL
+        GROUP BY GROUPING SETS ({sets})
+    """
+
+
+# correlations.frame_cross_products as SQL: per occupation, the rows with every
+# correlation field present, their field sums and the sum of every pair's product
+def cross_query(path):
+    values = []
+    for i, field in enumerate(FIELDS):
+        if field == "BMI":
+            cases = " ".join(f"WHEN {literal(label)} THEN {rank}" for label, rank in BMI_ORDER.items())
+            expression = f'CASE "BMI Category" {cases} END'
+        else:
+            expression = quote(field)
+        values.append(f"CAST({expression} AS DOUBLE) AS \"f{i}\"")
+    upper_i, upper_j = np.triu_indices(len(FIELDS))
+    measures = [f'sum("f{i}") AS "sum {i}"' for i in range(len(FIELDS))]
+    measures += [f'sum("f{i}" * "f{j}") AS "cross {i} {j}"' for i, j in zip(upper_i, upper_j)]
+    present = " AND ".join(f'"f{i}" IS NOT NULL' for i in range(len(FIELDS)))
+    return f"""
+        SELECT "Occupation", count(*) AS "count", min("Person ID") AS "first", {", ".join(measures)}
+        FROM (SELECT "Person ID", "Occupation", {", ".join(values)} FROM ({cleaned(path)}))
+        WHERE "Occupation" IS NOT NULL AND {present}
+        GROUP BY "Occupation"
+        ORDER BY "first"
+    """
+
+
+def cross_products_sql(path, connection=None):
+    connection = connection or connect()
+    rows = connection.sql(cross_query(path)).df()
+    groups = pd.Index(rows["Occupation"].to_numpy(dtype=object), name="Occupation")
+    upper_i, upper_j = np.triu_indices(len(FIELDS))
+    pair_sums = rows[[f"cross {i} {j}" for i, j in zip(upper_i, upper_j)]].to_numpy(dtype="float64")
+    cross = np.zeros((len(groups), len(FIELDS), len(FIELDS)))
+    cross[:, upper_i, upper_j] = pair_sums
+    cross[:, upper_j, upper_i] = pair_sums
+    counts = pd.Series(rows["count"].to_numpy(dtype="int64"), index=groups)
+    sums = pd.DataFrame(
+        rows[[f"sum {i}" for i in range(len(FIELDS))]].to_numpy(dtype="float64"), index=groups, columns=FIELDS
+    )
+    return CrossProducts(counts, sums, cross)
+
+
+# the raw view's columns in the order dataset.prepare leaves them, and the SQL type of
+# the numeric ones it can filter on with a range
+RAW_COLUMNS = [
+    "Person ID", "Gender", "Age", "Occupation", "Sleep Duration", "Quality of Sleep",
+    "Physical Activity Level", "Stress Level", "BMI Category", "Systolic", "Diastolic", "BP Stage",
+    "Heart Rate", "Daily Steps", "Sleep Disorder"
+]
+RANGE_TYPES = {
+    column: CSV_TYPES.get(column, "INTEGER")
+    for column in RAW_COLUMNS
+    if column in ["Person ID", "Systolic", "Diastolic"] + NUMERIC_COLUMNS
+}
+
+
+# rawview.filter_mask as a WHERE clause: range ends are cast to the column's own type,
+# as the pandas view compares in the column's precision
+def raw_where(occupations=(), ranges=()):
+    conditions = []
+    if occupations:
+        conditions.append(f'"Occupation" IN ({", ".join(literal(o) for o in occupations)})')
+    for column, low, high in ranges:
+        kind = RANGE_TYPES[column]
+        conditions.append(f"{quote(column)} BETWEEN CAST({float(low)!r} AS {kind}) AND CAST({float(high)!r} AS {kind})")
+    return f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+
+# rows, occupations and (min, max) of every numeric column for the raw view's widgets,
+# in one scan (floats rounded like rawview.column_bounds)
+def raw_bounds_sql(path, connection=None):
+    connection = connection or connect()
+    measures = []
+    for column in RANGE_TYPES:
+        measures += [f"min({quote(column)})", f"max({quote(column)})"]
+    row = connection.sql(f"""
+        SELECT count(*), list(DISTINCT "Occupation" ORDER BY "Occupation"), {", ".join(measures)}
+        FROM ({cleaned(path)})
+    """).fetchone()
+    total, occupations, values = row[0], [o for o in row[1] if o is not None], row[2:]
+    bounds = {}
+    for i, column in enumerate(RANGE_TYPES):
+        low, high = values[2 * i], values[2 * i + 1]
+        if low is None:
+            continue
+        if isinstance(low, float):
+            low, high = round(low, 2), round(high, 2)
+        bounds[column] = (low, high)
+    return total, occupations, bounds
+
+
+def raw_count_sql(path, occupations=(), ranges=(), connection=None):
+    connection = connection or connect()
+    query = f"SELECT count(*) FROM ({cleaned(path)}) {raw_where(occupations, ranges)}"
+    return connection.sql(query).fetchone()[0]
+
+
+# one page (1-based) of the matching rows, sorted on the server (labels alphabetically,
+# BP Stage by severity, missing values last, ties in file order) so only that page
+# ever leaves DuckDB
+def raw_page_sql(path, occupations=(), ranges=(), sort=None, ascending=True, number=1,
+                 size=PAGE_SIZE, columns=None, connection=None):
+    connection = connection or connect()
+    order = []
+    if sort == "BP Stage":
+        stages = " ".join(f"WHEN {literal(stage)} THEN {i}" for i, stage in enumerate(BP_STAGES))
+        order.append(f'CASE "BP Stage" {stages} END {"ASC" if ascending else "DESC"} NULLS LAST')
+    elif sort:
+        order.append(f"{quote(sort)} {'ASC' if ascending else 'DESC'} NULLS LAST")
+    order.append('"Person ID"')
+    start = (number - 1) * size
+    query = f"""
+        SELECT {", ".join(quote(c) for c in (columns or RAW_COLUMNS))}
+        FROM ({cleaned(path)}) {raw_where(occupations, ranges)}
+        ORDER BY {", ".join(order)}
+        LIMIT {int(size)} OFFSET {int(start)}
+    """
+    window = connection.sql(query).df()
+    window.index = pd.RangeIndex(start, start + len(window))
+    return window
+
+
+# memory_limit / temp_directory let large scans spill to disk instead of failing
+def connect(memory_limit=None, temp_directory=None, threads=None):
+    if duckdb is None:
+        raise RuntimeError("the duckdb backend needs the duckdb package (pip install duckdb)")
+    config = {}
+    if memory_limit or os.environ.get("HEALTH_DUCKDB_MEMORY"):
+        config["memory_limit"] = memory_limit or os.environ["HEALTH_DUCKDB_MEMORY"]
+    if temp_directory:
+        config["temp_directory"] = temp_directory
+    if threads:
+        config["threads"] = threads
+    return duckdb.connect(config=config)
+
+
+# the same OccupationSummary summarize() builds, computed by DuckDB straight from the
+# csv (or a parquet copy) without loading it into pandas
+def summarize_sql(path, connection=None, cross=False):
+    connection = connection or connect()
+    rows = connection.sql(summary_query(path)).df()
+
+    # occupations in file order (Person IDs are assigned in file order)
+    totals_mask = np.ones(len(rows), dtype=bool)
+    for column in CATEGORY_COLUMNS:
+        totals_mask &= rows["grouped " + column].to_numpy() == 1
+    totals = rows[totals_mask].sort_values("first", kind="stable")
+    if totals.empty:
+        raise ValueError("no rows to summarize")
+    occupations = pd.Index(totals["Occupation"].to_numpy(dtype=object), name="Occupation")
+    totals = totals.set_index(occupations)
+
+    counts = totals["count"].astype("int64").rename("count")
+    sums = pd.DataFrame({column: totals["sum " + column] for column in NUMERIC_COLUMNS}, index=occupations)
+    sumsq = pd.DataFrame({column: totals["sumsq " + column] for column in NUMERIC_COLUMNS}, index=occupations)
+
+    categories = {}
+    for column in CATEGORY_COLUMNS:
+        part = rows[(rows["grouped " + column] == 0) & rows[column].notna()]
+        table = part.pivot_table(index="Occupation", columns=column, values="count", aggfunc="sum", fill_value=0)
+        labels = pd.Index(np.asarray(sorted(table.columns), dtype=object), name=column)
+        categories[column] = table.reindex(index=occupations, columns=labels, fill_value=0).astype("int64")
+
+    products = cross_products_sql(path, connection) if cross else None
+    return OccupationSummary(counts, sums, sumsq, categories, products)
+
+
+# columnar copy of the raw csv, so later queries read only the columns they need
+def write_parquet(path, target, connection=None):
+    connection = connection or connect()
+    connection.execute(f"COPY (SELECT * FROM {scan(path)}) TO {literal(target)} (FORMAT parquet)")
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a parquet copy of a survey csv for the duckdb backend")
+    parser.add_argument("csv", nargs="?", default=DATA_FILE, help="survey csv to convert")
+    parser.add_argument("parquet", help="parquet file to write")
+    parser.add_argument("--memory-limit", help="e.g. 4GB; larger work spills to disk")
+    args = parser.parse_args()
+    print(write_parquet(args.csv, args.parquet, connect(memory_limit=args.memory_limit)))
+
+
+if __name__ == "__main__":
+    main()
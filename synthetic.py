@@ -0,0 +1,140 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pandas writer is slower but produces the same file
+    pa = None
+
+from dataset import DATA_FILE
+
+# raw csv column order, blood pressure still as "126/83"
+COLUMNS = [
+    "Person ID", "Gender", "Age", "Occupation", "Sleep Duration", "Quality of Sleep",
+    "Physical Activity Level", "Stress Level", "BMI Category", "Blood Pressure",
+    "Heart Rate", "Daily Steps", "Sleep Disorder"
+]
+
+# numeric fields that are jittered, with the number of decimals they are written with
+NUMERIC = {
+    "Age": 0,
+    "Sleep Duration": 1,
+    "Quality of Sleep": 0,
+    "Physical Activity Level": 0,
+    "Stress Level": 0,
+    "Systolic": 0,
+    "Diastolic": 0,
+    "Heart Rate": 0,
+    "Daily Steps": 0
+}
+
+# text fields kept exactly as labelled in the source, dirty labels included
+TEXT = ["Gender", "Occupation", "BMI Category", "Sleep Disorder"]
+
+
+# learns the joint structure of the source file: every respondent row (so the
+# occupation mix and the per-occupation combinations of sleep, stress, BMI and
+# disorder are preserved) plus per-occupation spreads used to jitter new rows
+class RespondentModel:
+    def __init__(self, path=DATA_FILE):
+        # keep "None", "Normal", "Salesperson" etc. as they appear in the raw file
+        raw = pd.read_csv(path, keep_default_na=False)
+        pressure = raw["Blood Pressure"].str.split("/", n=1, expand=True).astype("int64")
+        raw["Systolic"] = pressure[0]
+        raw["Diastolic"] = pressure[1]
+
+        self.text = {}
+        for column in TEXT:
+            codes, labels = pd.factorize(raw[column])
+            self.text[column] = (codes, np.asarray(labels, dtype=object))
+
+        occupation_codes = self.text["Occupation"][0]
+        self.values = raw[list(NUMERIC)].to_numpy(dtype="float64")
+        self.low = self.values.min(axis=0)
+        self.high = self.values.max(axis=0)
+
+        # spread of each field within each occupation (whole-file spread for tiny groups)
+        overall = self.values.std(axis=0)
+        spread = pd.DataFrame(self.values).groupby(occupation_codes).std(ddof=0).to_numpy()
+        counts = np.bincount(occupation_codes)[:, None]
+        self.spread = np.where((counts > 1) & (spread > 0), spread, overall)
+
+    def __len__(self):
+        return len(self.values)
+
+    # `rows` synthetic respondents: bootstrap source rows, then jitter their numeric fields
+    def sample(self, rows, rng, jitter=0.25, first_id=1):
+        picks = rng.integers(0, len(self), rows)
+        occupation = self.text["Occupation"][0][picks]
+
+        values = self.values[picks] + rng.standard_normal((rows, len(NUMERIC))) * self.spread[occupation] * jitter
+        values = np.clip(values, self.low, self.high)
+
+        columns = {"Person ID": np.arange(first_id, first_id + rows)}
+        for i, (column, decimals) in enumerate(NUMERIC.items()):
+            rounded = values[:, i].round(decimals)
+            columns[column] = rounded if decimals else rounded.astype("int64")
+
+        # diastolic stays below systolic after jittering
+        columns["Diastolic"] = np.minimum(columns["Diastolic"], columns["Systolic"] - 10)
+
+        for column in TEXT:
+            codes, labels = self.text[column]
+            columns[column] = pd.Categorical.from_codes(codes[picks], labels)
+
+        df = pd.DataFrame(columns)
+        df["Blood Pressure"] = (
+            df["Systolic"].astype(str) + "/" + df["Diastolic"].astype(str)
+        )
+        return df[COLUMNS]
+
+
+def write_chunk(df, path, header):
+    if pa is None:
+        df.to_csv(path, mode="w" if header else "a", header=header, index=False)
+        return
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # dictionary columns are written as their plain labels, unquoted like the source file
+    table = table.cast(pa.schema([
+        pa.field(f.name, pa.string()) if pa.types.is_dictionary(f.type) else f for f in table.schema
+    ]))
+    options = pa_csv.WriteOptions(include_header=False, quoting_style="none")
+    with open(path, "wb" if header else "ab") as f:
+        if header:
+            f.write((",".join(df.columns) + "\n").encode())
+        pa_csv.write_csv(table, f, write_options=options)
+
+
+# stream `rows` synthetic respondents to a csv with the source layout, one chunk at a time
+def write_csv(path, rows, chunksize=1_000_000, seed=0, jitter=0.25, source=DATA_FILE):
+    model = RespondentModel(source)
+    rng = np.random.default_rng(seed)
+    for first in range(0, rows, chunksize):
+        size = min(chunksize, rows - first)
+        chunk = model.sample(size, rng, jitter=jitter, first_id=first + 1)
+        write_chunk(chunk, path, header=first == 0)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic survey respondents for load testing")
+    parser.add_argument("output", help="csv file to write")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="number of respondents")
+    parser.add_argument("--chunksize", type=int, default=1_000_000, help="rows generated and written per chunk")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jitter", type=float, default=0.25, help="noise as a fraction of each occupation's spread")
+    parser.add_argument("--source", default=DATA_FILE, help="csv the generator learns from")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = write_csv(args.output, args.rows, args.chunksize, args.seed, args.jitter, args.source)
+    elapsed = time.perf_counter() - start
+    print(f"{written} rows written to {args.output} in {elapsed:.1f}s ({written / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import summarize_file
+from bootstrap import BootstrapRates, resample_counts
+from dataset import DATA_FILE
+
+
+# sleep disorder counts of the survey plus an occupation nobody answered for
+@pytest.fixture(scope="module")
+def counts():
+    counts = summarize_file(DATA_FILE).category_counts("Sleep Disorder")
+    return pd.concat([counts, pd.DataFrame(0, index=["Nobody"], columns=counts.columns)])
+
+
+def test_resamples_keep_occupation_totals(counts):
+    resampled, sizes = resample_counts(counts, 200, seed=7)
+    assert resampled.shape == (200, *counts.shape)
+    assert (sizes == counts.sum(axis=1).to_numpy()).all()
+    # every draw has each occupation's respondents, spread over the categories it has
+    assert (resampled.sum(axis=2) == sizes).all()
+    assert (resampled[:, counts.to_numpy() == 0] == 0).all()
+    assert (resampled[:, counts.index.get_loc("Nobody")] == 0).all()
+
+
+def test_resamples_are_seeded(counts):
+    first, _ = resample_counts(counts, 50, seed=7)
+    again, _ = resample_counts(counts, 50, seed=7)
+    other, _ = resample_counts(counts, 50, seed=8)
+    assert (first == again).all()
+    assert (first != other).any()
+
+
+def test_intervals_bracket_the_observed_share(counts):
+    rates = BootstrapRates(counts, seed=3)
+    pct = counts.div(counts.sum(axis=1).replace(0, 1), axis=0) * 100
+    labels = counts.index.tolist()
+    for categories in (["Insomnia"], ["Insomnia", "Sleep Apnea"], ["No Disorder"]):
+        interval = rates.interval(labels, categories)
+        point = pct[categories].sum(axis=1)
+        assert (interval["low"] <= point).all()
+        assert (point <= interval["high"]).all()
+        assert (interval.loc["Nobody"] == 0).all()
+        # a wider level gives an interval at least as wide
+        wide = rates.interval(labels, categories, level=0.99)
+        assert (wide["low"] <= interval["low"]).all() and (interval["high"] <= wide["high"]).all()
+
+    # categories missing from the table add nothing
+    assert np.allclose(rates.interval(labels, ["Insomnia", "Narcolepsy"]), rates.interval(labels, ["Insomnia"]))
@@ -0,0 +1,115 @@
+import logging
+import os
+
+import pytest
+
+import incremental
+from dataset import DATA_FILE
+from incremental import IncrementalSummary
+
+
+@pytest.fixture
+def lines():
+    with open(DATA_FILE, "rb") as f:
+        return f.read().splitlines(keepends=True)
+
+
+@pytest.fixture
+def growing(tmp_path, lines, monkeypatch):
+    # small blocks so every refresh spans several of them
+    monkeypatch.setattr(incremental, "BLOCK_SIZE", 500)
+    path = tmp_path / "growing.csv"
+    path.write_bytes(lines[0])
+    return path
+
+
+def append(path, data):
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+# the age of a good row swapped for text, so the row fails the schema
+def malformed(line):
+    fields = line.split(b",")
+    fields[2] = b"abc"
+    return b",".join(fields)
+
+
+def assert_state(summary, rows, rejected, offset, total_rows=None):
+    assert summary.rows == rows
+    assert summary.rejected == rejected
+    assert summary.offset == offset
+    assert summary.total_rows == (rows if total_rows is None else total_rows)
+    assert summary.summary.counts.sum() == summary.total_rows
+
+
+def test_appended_rows_are_folded_in(growing, lines, caplog):
+    summary = IncrementalSummary(str(growing), state_path=str(growing) + ".pkl")
+
+    append(growing, b"".join(lines[1:41]))
+    assert summary.refresh()[2] == 40
+    assert_state(summary, 40, 0, os.path.getsize(growing))
+
+    # a good block with one malformed row in the middle: the row is logged and left out
+    bad_at = os.path.getsize(growing) + len(b"".join(lines[41:51]))
+    append(growing, b"".join(lines[41:51]) + malformed(lines[51]) + b"".join(lines[52:71]))
+    with caplog.at_level(logging.WARNING, logger="workplace_health.incremental"):
+        assert summary.refresh()[2] == 29
+    assert f"skipping malformed row at byte {bad_at} of" in caplog.text
+    assert_state(summary, 69, 1, os.path.getsize(growing))
+
+    # half of a row, still being written: not counted and the offset stays before it
+    complete = os.path.getsize(growing)
+    cut = len(lines[71]) // 2
+    append(growing, lines[71][:cut])
+    assert summary.refresh()[2] == 0
+    assert_state(summary, 69, 1, complete)
+
+    # the rest of it arrives
+    append(growing, lines[71][cut:])
+    assert summary.refresh()[2] == 1
+    assert_state(summary, 70, 1, os.path.getsize(growing))
+
+    # a whole last row without its newline yet is counted, but read again with the next block
+    complete = os.path.getsize(growing)
+    append(growing, lines[72].rstrip(b"\n"))
+    summary.refresh()
+    assert_state(summary, 70, 1, complete, total_rows=71)
+    assert summary.tail_size == len(lines[72]) - 1
+    append(growing, b"\n")
+    summary.refresh()
+    assert_state(summary, 71, 1, os.path.getsize(growing))
+    assert summary.tail_size == 0
+
+
+def test_state_is_reloaded(growing, lines):
+    state_path = str(growing) + ".pkl"
+    append(growing, b"".join(lines[1:21]) + malformed(lines[21]) + b"".join(lines[22:31]))
+    summary = IncrementalSummary(str(growing), state_path=state_path)
+    _, version, _ = summary.refresh()
+
+    # a fresh process picks up from the saved offset, rows and rejected count
+    reloaded = IncrementalSummary(str(growing), state_path=state_path)
+    assert_state(reloaded, 29, 1, os.path.getsize(growing))
+    assert reloaded.refresh()[1:] == (version, 0)
+
+    append(growing, b"".join(lines[31:36]))
+    assert reloaded.refresh()[2] == 5
+    assert_state(reloaded, 34, 1, os.path.getsize(growing))
+
+
+def test_replaced_file_is_read_from_the_start(growing, lines):
+    summary = IncrementalSummary(str(growing), state_path=str(growing) + ".pkl")
+    append(growing, b"".join(lines[1:31]) + malformed(lines[31]))
+    summary.refresh()
+    assert_state(summary, 30, 1, os.path.getsize(growing))
+
+    # another first row: the file was replaced, not appended to
+    growing.write_bytes(lines[0] + b"".join(lines[101:141]))
+    assert summary.refresh()[2] == 40
+    assert_state(summary, 40, 0, os.path.getsize(growing))
+
+    # shrunk below the offset
+    growing.write_bytes(lines[0] + b"".join(lines[101:111]))
+    assert summary.refresh()[2] == 10
+    assert_state(summary, 10, 0, os.path.getsize(growing))
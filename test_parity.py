@@ -0,0 +1,131 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import incremental
+import sqlbackend
+from aggregates import question_tables, summarize_file, summarize_shards
+from dataset import DATA_FILE, parse_blood_pressure
+from incremental import IncrementalSummary
+
+# rows the cleaning has to fix: occupation and BMI synonyms, padded and missing sleep
+# disorders, a missing blood pressure reading and a row without an occupation
+DIRTY_ROWS = [
+    "901,Male,31,Salesperson,6.3,6,45,7,Normal,128/84,72,5200, Insomnia ",
+    "902,Female,44,Software Engineer,7.4,8,60,4,Overweight,,70,7000,",
+    "903,Female,52,Nurse,6.5,6,75,7,Obese,,80,6500,None",
+    "904,Male,39,Sales Representative,5.9,5,30,8,Overweight,141/92,84,3200,Sleep Apnea",
+    "905,Female,29,,6.8,7,50,5,Normal Weight,118/76,68,6100,None",
+    # pandas' other NA tokens and whitespace str.strip() removes but SQL trim() does not
+    "906,Male,36,Lawyer,7.1,7,55,5,Normal Weight,122/79,70,6800,n/a",
+    "907,Female,41,Teacher,6.6,7,48,5,1.#QNAN,131/86,71,5600,<NA>",
+    "908,Male,33,Doctor,6.0,6,40,7,Normal,129/84,74,4800,#N/A",
+    "909,Female,47,Nurse,6.4,6,70,7,Overweight,139/89,78,6200,-NaN",
+    '910,Male,38,Accountant,7.2,8,62,4,Normal,119/78,68,7100,"\tInsomnia\r"',
+    # readings that are not two whole numbers: no Systolic / Diastolic and no stage
+    "911,Male,45,Engineer,6.9,7,52,6,Normal,120,69,6400,None",
+    "912,Female,50,Nurse,6.1,6,58,7,Overweight,abc/80,77,5900,None",
+]
+
+
+@pytest.fixture
+def survey(tmp_path):
+    with open(DATA_FILE) as f:
+        lines = f.read().splitlines()
+    path = tmp_path / "survey.csv"
+    path.write_text("\n".join(lines + DIRTY_ROWS) + "\n")
+    return str(path)
+
+
+def tables(summary):
+    return {name: pd.DataFrame(table) for name, table in question_tables(summary).items()}
+
+
+# same numbers, whatever index / column dtypes and names each backend produced
+def assert_same_tables(actual, expected):
+    assert actual.keys() == expected.keys()
+    for name in expected:
+        left, right = actual[name].copy(), expected[name].copy()
+        for frame in (left, right):
+            frame.index = frame.index.astype(object).rename(None)
+            frame.columns = frame.columns.astype(object).rename(None)
+        pd.testing.assert_frame_equal(left, right, check_dtype=False, rtol=1e-9, obj=name)
+
+
+def test_dirty_rows_are_cleaned(survey):
+    summary = summarize_file(survey)
+    with open(DATA_FILE) as f:
+        original_rows = len(f.read().splitlines()) - 1
+    assert "Salesperson" not in summary.occupations
+    assert "Software Engineer" not in summary.occupations
+    assert "Normal" not in summary.category_counts("BMI Category").columns
+    assert set(summary.category_counts("Sleep Disorder").columns) == {"Insomnia", "No Disorder", "Sleep Apnea"}
+    # the row without an occupation is dropped; the two without a blood pressure
+    # reading and the two with a malformed one count everywhere except in the stage breakdown
+    assert summary.counts.sum() == original_rows + len(DIRTY_ROWS) - 1
+    assert summary.category_counts("BP Stage").to_numpy().sum() == summary.counts.sum() - 4
+
+
+def test_malformed_blood_pressure_is_left_unstaged():
+    df = parse_blood_pressure(pd.DataFrame({"Blood Pressure": ["126/83", "120", "abc/80", "120/80/70", None]}))
+    assert df["Systolic"].dtype == "float32"
+    assert df["Systolic"].tolist()[0] == 126 and df["Diastolic"].tolist()[0] == 83
+    assert df[["Systolic", "Diastolic"]].iloc[1:].isna().all().all()
+    assert df["BP Stage"].tolist() == ["Stage 1", np.nan, np.nan, np.nan, np.nan]
+    # well-formed readings keep the compact integer columns
+    assert parse_blood_pressure(pd.DataFrame({"Blood Pressure": ["126/83"]}))["Systolic"].dtype == "int16"
+
+
+def test_chunked_matches_whole_file(survey):
+    assert_same_tables(tables(summarize_file(survey, chunksize=37)), tables(summarize_file(survey)))
+
+
+def test_shards_match_whole_file(survey, tmp_path):
+    with open(survey) as f:
+        header, *rows = f.read().splitlines()
+    paths = []
+    for i, part in enumerate(np.array_split(np.array(rows, dtype=object), 3)):
+        path = tmp_path / f"shard{i}.csv"
+        path.write_text("\n".join([header, *part]) + "\n")
+        paths.append(str(path))
+    assert_same_tables(tables(summarize_shards(paths, workers=2)), tables(summarize_file(survey)))
+
+
+def test_duckdb_matches_pandas(survey):
+    pytest.importorskip("duckdb")
+    assert_same_tables(tables(summarize_file(survey, backend="duckdb")), tables(summarize_file(survey)))
+
+
+def test_duckdb_matches_pandas_on_crlf_file(survey, tmp_path):
+    pytest.importorskip("duckdb")
+    path = tmp_path / "crlf.csv"
+    with open(survey) as f:
+        path.write_bytes(f.read().replace("\n", "\r\n").encode())
+    assert_same_tables(tables(summarize_file(str(path), backend="duckdb")), tables(summarize_file(survey)))
+
+
+def test_duckdb_null_strings_match_pandas():
+    from pandas._libs.parsers import STR_NA_VALUES
+    assert set(sqlbackend.NULL_STRINGS) == STR_NA_VALUES
+
+
+def test_incremental_matches_whole_file(survey, tmp_path, monkeypatch):
+    monkeypatch.setattr(incremental, "BLOCK_SIZE", 2000)
+    with open(survey, "rb") as f:
+        data = f.read()
+    path = tmp_path / "growing.csv"
+    summary = IncrementalSummary(str(path), state_path=str(tmp_path / "growing.summary.pkl"))
+    # appended in uneven pieces, most of them ending mid-row
+    cuts = [0, 9000, 9001, 15000, 24333, len(data)]
+    for start, end in zip(cuts, cuts[1:]):
+        with open(path, "ab") as f:
+            f.write(data[start:end])
+        result, _, _ = summary.refresh()
+    assert_same_tables(tables(result), tables(summarize_file(survey)))
+
+    # a fresh process picks up from the saved state
+    reloaded = IncrementalSummary(str(path), state_path=str(tmp_path / "growing.summary.pkl"))
+    assert reloaded.refresh()[2] == 0
+    assert os.path.getsize(path) == len(data)